@@ -0,0 +1,105 @@
+"""
+Agents are imported lazily: `from agents import parser_agent` returns a
+proxy, and the real module (with pdfminer, transformers and the like) is
+imported on first attribute access or by warm_up(). Importing a submodule
+directly (`from agents.parser_agent import ...`) still loads it eagerly.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+import types
+
+logger = logging.getLogger(__name__)
+
+AGENT_MODULES = (
+    "audio_agent", "classifier_agent", "parser_agent",
+    "search_agent", "summarizer_agent", "synthesizer_agent"
+)
+# Third-party modules the agents import inside their functions, loaded
+# ahead of the first request by warm_up
+HEAVY_DEPENDENCIES = {
+    "parser_agent": ("pdfminer.high_level", "pdfminer.pdfinterp", "pdfminer.converter", "bs4"),
+    "summarizer_agent": ("transformers",),
+}
+WARMUP_MODES = ("off", "imports", "models")
+
+_proxies = {}
+_load_times = {}
+_lock = threading.Lock()
+
+class LazyModule(types.ModuleType):
+    """Stands in for agents.<name> and imports it on first attribute access"""
+    def __init__(self, name: str):
+        super().__init__(f"{__name__}.{name}")
+        self._agent_name = name
+
+    def __getattr__(self, attribute):
+        # Attributes are not cached here so patching the real module still takes effect
+        return getattr(load(self._agent_name), attribute)
+
+    def __repr__(self):
+        loaded = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module '{self.__name__}' ({loaded})>"
+
+def load(name: str, trigger: str = "first use") -> types.ModuleType:
+    """Import agents.<name> if it is not imported yet and return it"""
+    full_name = f"{__name__}.{name}"
+    module = sys.modules.get(full_name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(full_name)
+    elapsed = time.perf_counter() - started
+    with _lock:
+        first = name not in _load_times
+        if first:
+            _load_times[name] = {'seconds': elapsed, 'trigger': trigger}
+    if first:
+        logger.info("Loaded %s in %.0f ms (%s)", full_name, elapsed * 1000, trigger)
+    return module
+
+def __getattr__(name: str):
+    if name not in AGENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+    return proxy
+
+def warm_up(mode: str = "imports") -> dict:
+    """
+    Import every agent and its heavy dependencies; with mode "models" also
+    load the summarization model. Failures are logged, not raised, so a
+    missing optional dependency only fails the requests that need it.
+    """
+    timings = {}
+    if mode == "off":
+        return timings
+    for name in AGENT_MODULES:
+        started = time.perf_counter()
+        try:
+            load(name, "warmup")
+            for dependency in HEAVY_DEPENDENCIES.get(name, ()):
+                importlib.import_module(dependency)
+            if mode == "models" and name == "summarizer_agent":
+                load(name).get_summarizer()
+        except Exception as e:
+            logger.warning("Warming up %s failed: %s", name, e)
+        timings[name] = time.perf_counter() - started
+    logger.info("Agent warmup (%s) took %.0f ms", mode, sum(timings.values()) * 1000)
+    return timings
+
+def warm_up_in_background(mode: str = "imports") -> threading.Thread:
+    """Run warm_up on a daemon thread; requests that need an agent first just import it themselves"""
+    thread = threading.Thread(target=warm_up, args=(mode,), name="agent-warmup", daemon=True)
+    thread.start()
+    return thread
+
+def load_times() -> dict:
+    """When each agent was first imported and how long it took, by agent"""
+    with _lock:
+        return {name: dict(info) for name, info in _load_times.items()}
@@ -1,34 +1,69 @@
 import os
+import sys
 import uuid
 import re
+import json
+import hashlib
+import io
+import time
+import shutil
+import subprocess
+import importlib.util
+import threading
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def generate_audio(text: str) -> str:
+from config import Config
+import metrics
+import storage
+
+logger = logging.getLogger(__name__)
+
+AUDIO_MANIFEST = "audio_manifest.json"
+
+# Content-addressed audio cache: key -> {'file', 'size', 'created_at'}
+_audio_manifest = None
+_audio_manifest_lock = threading.Lock()
+
+_chunk_executor = None
+_chunk_executor_lock = threading.Lock()
+
+def generate_audio(text: str, lang: str = 'en', slow: bool = False, on_chunk=None) -> str:
+    """
+    Synthesize narration for text into the data directory and return its
+    data/... path, or "" on failure. on_chunk, if given, is called as
+    on_chunk(index, mp3_bytes) with each chunk's frames in order as soon as
+    they are ready, so callers can stream audio before the file is complete.
+    Index 0 marks the start of a new attempt (e.g. after an engine failover).
+    """
     try:
-        # Try to import gTTS
-        try:
-            from gtts import gTTS
-            print("gTTS imported successfully")
-        except ImportError as e:
-            print(f"gTTS import failed: {e}")
-            print("Please install gTTS: pip install gTTS")
+        # Make sure at least one configured TTS engine can run here
+        engines = get_tts_engines()
+        if not engines:
+            logger.warning("No TTS engine available (configured: %s)", ', '.join(Config.get_tts_engine_names()))
+            logger.warning("Please install gTTS (pip install gTTS) or espeak-ng with ffmpeg or lame")
             return ""
+        logger.debug("TTS engines in failover order: %s", ', '.join(engine.name for engine in engines))
         
-        print(f"Audio generation called with text type: {type(text)}")
-        print(f"Text preview: {str(text)[:200]}...")
+        logger.debug("Audio generation called with text type: %s", type(text))
+        logger.debug("Text preview: %s...", str(text)[:200])
         
         # Validate input
         if not text or not isinstance(text, str):
-            print(f"Invalid text for audio generation: {type(text)} - {text}")
+            logger.warning("Invalid text for audio generation: %s", type(text))
             return ""
         
         text = text.strip()
         if not text:
-            print("Empty text provided for audio generation")
+            logger.debug("Empty text provided for audio generation")
             return ""
         
         # Check if text is an error message
         if text.startswith("Error:") or text.startswith("Document Processing Error:") or text.startswith("Unable to extract"):
-            print(f"Skipping audio generation for error text: {text[:100]}...")
+            logger.info("Skipping audio generation for error text: %s...", text[:100])
             return ""
         
         # Clean text for audio generation - simplified approach
@@ -39,67 +74,365 @@ def generate_audio(text: str) -> str:
         # Remove only the most problematic characters for TTS
         cleaned_text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', '', cleaned_text)
         
-        # Limit text length to prevent issues
-        if len(cleaned_text) > 4000:
-            # Take the first part and add a note
-            cleaned_text = cleaned_text[:4000] + "... [Audio truncated due to length]"
-            print(f"Text cleaned and truncated for audio generation to {len(cleaned_text)} characters")
-        else:
-            print(f"Text cleaned for audio generation: {len(cleaned_text)} characters")
+        # Long text is split into sentence chunks by synthesize_speech, so no length cap
+        logger.debug("Text cleaned for audio generation: %s characters", len(cleaned_text))
         
         # Final validation - ensure we have meaningful text
         if len(cleaned_text.strip()) < 10:
-            print("Text too short for audio generation after cleaning")
+            logger.debug("Text too short for audio generation after cleaning")
             return ""
         
         # Create data directory if it doesn't exist
-        data_dir = "data"
+        data_dir = storage.DATA_DIR
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
-            print(f"Created data directory: {data_dir}")
+            logger.debug("Created data directory: %s", data_dir)
+        
+        # Identical text and voice settings always map to the same file
+        cache_key = audio_cache_key(cleaned_text, lang, slow)
+        cached_filename = lookup_cached_audio(cache_key, data_dir)
+        metrics.CACHE_REQUESTS.inc(cache="audio", result="hit" if cached_filename else "miss")
+        if cached_filename:
+            storage.touch(cached_filename)
+            logger.debug("Audio cache hit: data/%s", cached_filename)
+            return f"data/{cached_filename}"
         
-        # Generate unique filename
-        audio_filename = f"audio_{uuid.uuid4().hex}.mp3"
-        audio_path = os.path.join(data_dir, audio_filename)
+        # Relative to the data directory, in the sharded layout (audio/<shard>/...)
+        audio_filename = storage.shard_path(f"audio_{cache_key[:32]}.mp3", "audio")
+        audio_path = storage.prepare_path(audio_filename)
         
-        print(f"Generating audio file: {audio_path}")
-        print(f"Final text for TTS: {cleaned_text[:100]}...")
+        logger.debug("Generating audio file: %s", audio_path)
+        logger.debug("Final text for TTS: %s...", cleaned_text[:100])
         
         # Generate audio with simple fallback
         try:
-            tts = gTTS(text=cleaned_text, lang='en', slow=False)
-            tts.save(audio_path)
-            print("TTS.save() completed successfully")
+            # Write to a temporary name so a concurrent cache hit never sees a partial file
+            partial_path = f"{audio_path}.{uuid.uuid4().hex}.part"
+            engine_name = synthesize_speech(cleaned_text, partial_path, lang, slow, on_chunk)
+            os.replace(partial_path, audio_path)
+            # Audio from a failover engine is served but not cached, so the
+            # preferred voice is used again once that engine recovers
+            if engine_name == engines[0].name:
+                register_cached_audio(cache_key, audio_filename, data_dir)
+            logger.debug("TTS completed successfully with %s", engine_name)
         except Exception as tts_error:
-            print(f"TTS generation failed: {tts_error}")
-            # Try with a simple fallback text
+            logger.warning("TTS generation failed: %s", tts_error)
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            # Try with a simple fallback text; it does not match the cache key,
+            # so it gets a one-off filename and stays out of the manifest
             try:
+                audio_filename = storage.shard_path(f"audio_{uuid.uuid4().hex}.mp3", "audio")
+                audio_path = storage.prepare_path(audio_filename)
                 fallback_text = "This is a summary of the research paper."
-                tts = gTTS(text=fallback_text, lang='en', slow=False)
-                tts.save(audio_path)
-                print("Fallback TTS generation completed")
+                synthesize_speech(fallback_text, audio_path, lang, slow)
+                metrics.FALLBACKS.inc(kind="tts_text")
+                logger.debug("Fallback TTS generation completed")
             except Exception as fallback_error:
-                print(f"Fallback TTS also failed: {fallback_error}")
+                logger.error("Fallback TTS also failed: %s", fallback_error)
                 return ""
         
         # Verify file was created
         if not os.path.exists(audio_path):
-            print(f"Audio file was not created at {audio_path}")
+            logger.error("Audio file was not created at %s", audio_path)
             return ""
         
         file_size = os.path.getsize(audio_path)
-        print(f"Audio file created successfully: {audio_path} (size: {file_size} bytes)")
+        logger.debug("Audio file created successfully: %s (size: %s bytes)", audio_path, file_size)
+        
+        # Track the file for quota and TTL eviction
+        storage.record_write(audio_filename)
         
         # Return the path that will be accessible via the static file server
         return f"data/{audio_filename}"
         
     except Exception as e:
-        print(f"Audio generation error: {e}")
-        import traceback
-        print(f"Audio generation traceback: {traceback.format_exc()}")
+        logger.exception("Audio generation error: %s", e)
         # Return empty string if audio generation fails
         return ""
 
+def audio_cache_key(cleaned_text: str, lang: str, slow: bool) -> str:
+    """Content hash of everything that determines the synthesized audio"""
+    engine = ','.join(Config.get_tts_engine_names())
+    payload = json.dumps({'text': cleaned_text, 'lang': lang, 'slow': slow, 'engine': engine}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_audio_manifest(data_dir: str) -> dict:
+    """Load the cache manifest (key -> file entry) once per process; caller holds the lock"""
+    global _audio_manifest
+    if _audio_manifest is None:
+        manifest_path = os.path.join(data_dir, AUDIO_MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                _audio_manifest = json.load(f)
+        except (OSError, ValueError):
+            _audio_manifest = {}
+    return _audio_manifest
+
+def save_audio_manifest(data_dir: str):
+    """Atomically rewrite the manifest; caller holds the lock"""
+    manifest_path = os.path.join(data_dir, AUDIO_MANIFEST)
+    temp_path = f"{manifest_path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(_audio_manifest, f, indent=1)
+    os.replace(temp_path, manifest_path)
+
+def lookup_cached_audio(cache_key: str, data_dir: str) -> str:
+    """Return the cached filename for a key, or an empty string"""
+    with _audio_manifest_lock:
+        manifest = load_audio_manifest(data_dir)
+        entry = manifest.get(cache_key)
+        if entry and os.path.exists(os.path.join(data_dir, entry['file'])):
+            return entry['file']
+        if entry:
+            # The file was removed behind our back
+            del manifest[cache_key]
+            save_audio_manifest(data_dir)
+    return ""
+
+def register_cached_audio(cache_key: str, audio_filename: str, data_dir: str):
+    with _audio_manifest_lock:
+        manifest = load_audio_manifest(data_dir)
+        manifest[cache_key] = {
+            'file': audio_filename,
+            'size': os.path.getsize(os.path.join(data_dir, audio_filename)),
+            'created_at': datetime.now().isoformat()
+        }
+        save_audio_manifest(data_dir)
+
+def synthesize_speech(text: str, audio_path: str, lang: str = 'en', slow: bool = False, on_chunk=None) -> str:
+    """
+    Write MP3 speech for text to audio_path and return the name of the engine
+    that produced it. Text longer than one chunk is split at sentence
+    boundaries, the chunks are synthesized concurrently and their MP3 frames
+    are joined in order. If an engine fails, the whole text is retried on the
+    next available engine so a narration never mixes voices. on_chunk is
+    passed through to synthesize_chunks.
+    """
+    engines = get_tts_engines()
+    if not engines:
+        raise RuntimeError("No TTS engine is available")
+    
+    chunks = split_into_tts_chunks(text, Config.get_tts_chunk_chars())
+    errors = []
+    for engine in engines:
+        try:
+            audio = synthesize_chunks(engine, chunks, lang, slow, on_chunk)
+        except Exception as e:
+            logger.warning("TTS engine %s failed: %s", engine.name, e)
+            metrics.UPSTREAM_ERRORS.inc(upstream=f"tts_{engine.name}")
+            errors.append(f"{engine.name}: {e}")
+            continue
+        with open(audio_path, 'wb') as f:
+            f.write(audio)
+        if engine is not engines[0]:
+            metrics.FALLBACKS.inc(kind="tts_engine")
+        return engine.name
+    raise RuntimeError(f"All TTS engines failed ({'; '.join(errors)})")
+
+def synthesize_chunks(engine, chunks: list, lang: str, slow: bool, on_chunk=None) -> bytes:
+    """Synthesize chunks concurrently and join them; on_chunk(index, frames) sees each part in order"""
+    if len(chunks) == 1:
+        parts = [synthesize_chunk_with_retry(engine, chunks[0], lang, slow)]
+    else:
+        logger.debug("Synthesizing %s chunks with %s, up to %s in parallel", len(chunks), engine.name, Config.get_tts_parallelism())
+        executor = get_chunk_executor()
+        # map() yields results in submission order and re-raises the first chunk failure
+        parts = executor.map(lambda chunk: synthesize_chunk_with_retry(engine, chunk, lang, slow), chunks)
+    frames = []
+    for index, part in enumerate(parts):
+        frames.append(strip_id3_tags(part))
+        if on_chunk:
+            on_chunk(index, frames[-1])
+    return b"".join(frames)
+
+def get_chunk_executor() -> ThreadPoolExecutor:
+    """Shared pool that bounds concurrent TTS requests across all audio jobs"""
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ThreadPoolExecutor(
+                max_workers=Config.get_tts_parallelism(),
+                thread_name_prefix="tts-chunk"
+            )
+        return _chunk_executor
+
+def split_into_tts_chunks(text: str, max_chars: int) -> list:
+    """Pack whole sentences into chunks of at most max_chars; split overlong sentences at spaces"""
+    chunks = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+def synthesize_chunk_with_retry(engine, text: str, lang: str, slow: bool) -> bytes:
+    """Synthesize one chunk, retrying transient failures with exponential backoff"""
+    retries = Config.get_tts_chunk_retries()
+    for attempt in range(retries + 1):
+        try:
+            return engine.synthesize(text, lang, slow)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 0.5 * (2 ** attempt)
+            logger.warning("TTS chunk failed on %s (%s), retrying in %.1fs", engine.name, e, delay)
+            time.sleep(delay)
+
+class TTSEngine(ABC):
+    """A text-to-speech backend that turns a chunk of text into MP3 bytes"""
+    name = ""
+    
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether the engine can run here (library installed, binary on PATH, URL configured)"""
+    
+    @abstractmethod
+    def synthesize(self, text: str, lang: str, slow: bool) -> bytes:
+        """MP3 bytes for one chunk of text; raises on failure"""
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS through gTTS (needs internet)"""
+    name = "gtts"
+    
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("gtts") is not None
+    
+    def synthesize(self, text: str, lang: str, slow: bool) -> bytes:
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+class TTSServiceEngine(TTSEngine):
+    """HTTP TTS service, e.g. the upstream stand-in (see Config.get_tts_service_url)"""
+    name = "tts_service"
+    
+    def is_available(self) -> bool:
+        return bool(Config.get_tts_service_url())
+    
+    def synthesize(self, text: str, lang: str, slow: bool) -> bytes:
+        import requests
+        response = requests.post(
+            Config.get_tts_service_url(),
+            json={'text': text, 'lang': lang, 'slow': slow},
+            timeout=Config.get_fetch_timeout()
+        )
+        response.raise_for_status()
+        return response.content
+
+class EspeakEngine(TTSEngine):
+    """Local CPU synthesis with espeak-ng (or espeak), encoded to MP3 with ffmpeg or lame"""
+    name = "espeak"
+    
+    def speech_binary(self):
+        return shutil.which("espeak-ng") or shutil.which("espeak")
+    
+    def encoder_command(self):
+        if shutil.which("ffmpeg"):
+            # No Xing or ID3 headers so chunks concatenate cleanly
+            return ["ffmpeg", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+                    "-codec:a", "libmp3lame", "-b:a", "64k", "-write_xing", "0",
+                    "-id3v2_version", "0", "-f", "mp3", "pipe:1"]
+        if shutil.which("lame"):
+            return ["lame", "--quiet", "-b", "64", "-", "-"]
+        return None
+    
+    def is_available(self) -> bool:
+        return bool(self.speech_binary() and self.encoder_command())
+    
+    def synthesize(self, text: str, lang: str, slow: bool) -> bytes:
+        words_per_minute = "130" if slow else "175"
+        wav = subprocess.run(
+            [self.speech_binary(), "-v", lang, "-s", words_per_minute, "--stdin", "--stdout"],
+            input=text.encode("utf-8"), capture_output=True, check=True, timeout=120
+        ).stdout
+        return subprocess.run(
+            self.encoder_command(), input=wav, capture_output=True, check=True, timeout=120
+        ).stdout
+
+TTS_ENGINES = {engine.name: engine for engine in (GTTSEngine(), TTSServiceEngine(), EspeakEngine())}
+
+def get_tts_engines() -> list:
+    """Configured engines that can run here, in failover order"""
+    engines = []
+    for name in Config.get_tts_engine_names():
+        engine = TTS_ENGINES.get(name)
+        if engine is None:
+            logger.warning("Unknown TTS engine '%s', expected one of %s", name, ', '.join(TTS_ENGINES))
+        elif engine.is_available():
+            engines.append(engine)
+    return engines
+
+def strip_id3_tags(data: bytes) -> bytes:
+    """Drop the ID3 tags from an MP3 part so parts can be joined frame to frame"""
+    # ID3v2: "ID3", version (2 bytes), flags, then a 4-byte syncsafe size
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    # ID3v1: fixed 128-byte trailer starting with "TAG"
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+# Layer III bitrates (kbit/s) by MPEG version; index 0 is "free", 15 is invalid
+MP3_BITRATES = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+# Sample rates by the 2-bit version ID in the frame header (1 is reserved)
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def iter_mp3_frames(data: bytes):
+    """Yield (offset, length, duration in seconds) for each Layer III frame in an MP3 stream"""
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        offset = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+    while offset + 4 <= len(data):
+        header = data[offset:offset + 4]
+        version_id = (header[1] >> 3) & 0x03
+        layer = (header[1] >> 1) & 0x03
+        bitrate_index = header[2] >> 4
+        sample_rate_index = (header[2] >> 2) & 0x03
+        if (header[0] != 0xFF or (header[1] & 0xE0) != 0xE0 or layer != 1 or version_id == 1
+                or bitrate_index in (0, 15) or sample_rate_index == 3):
+            # Not a Layer III frame header; resynchronize on the next byte
+            offset += 1
+            continue
+        padding = (header[2] >> 1) & 0x01
+        sample_rate = MP3_SAMPLE_RATES[version_id][sample_rate_index]
+        if version_id == 3:
+            bitrate = MP3_BITRATES['mpeg1'][bitrate_index] * 1000
+            length = 144 * bitrate // sample_rate + padding
+            samples = 1152
+        else:
+            bitrate = MP3_BITRATES['mpeg2'][bitrate_index] * 1000
+            length = 72 * bitrate // sample_rate + padding
+            samples = 576
+        yield offset, length, samples / sample_rate
+        offset += length
+
+def mp3_duration_seconds(data: bytes) -> float:
+    """Playback length of an MP3 stream, summed frame by frame"""
+    return sum(duration for _, _, duration in iter_mp3_frames(data))
+
 def is_garbled_text(text: str) -> bool:
     """Check if text contains garbled or binary content"""
     
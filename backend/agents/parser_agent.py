@@ -1,55 +1,80 @@
+import hashlib
 import io
 import re
 import os
-from pdfminer.high_level import extract_text
-from pdfminer.pdfparser import PDFParser
-from pdfminer.pdfdocument import PDFDocument
-from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.layout import LAParams
-from pdfminer.converter import TextConverter
+import sys
+import logging
+
+# Add the parent directory to the path so we can import storage and executors
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+import executors
+
+logger = logging.getLogger(__name__)
 
 async def read_pdf(file):
     """Read PDF file with improved error handling and fallback methods"""
     try:
         contents = await file.read()
         
-        # Save file to disk
-        file_path = f"data/{file.filename}"
-        os.makedirs("data", exist_ok=True)
-        with open(file_path, 'wb') as f:
-            f.write(contents)
-        
-        # Try primary method: pdfminer high-level extraction
-        try:
-            text = extract_text(io.BytesIO(contents))
-            if is_valid_text(text):
-                print(f"Successfully extracted text using pdfminer high-level: {len(text)} characters")
-                return text
-        except Exception as e:
-            print(f"Primary PDF extraction failed: {e}")
-        
-        # Fallback method: manual extraction with better error handling
-        try:
-            text = extract_text_manual(io.BytesIO(contents))
-            if is_valid_text(text):
-                print(f"Successfully extracted text using manual method: {len(text)} characters")
-                return text
-        except Exception as e:
-            print(f"Manual PDF extraction failed: {e}")
-        
-        # Final fallback: return error message
-        error_msg = "Unable to extract text from PDF. The file may be corrupted, password-protected, or contain only images."
-        print(error_msg)
-        return error_msg
+        # Disk writes and pdfminer run off the event loop
+        await executors.run_io(save_upload, contents, file.filename)
+        return await executors.run_cpu(extract_text_from_pdf_bytes, contents)
         
     except Exception as e:
         error_msg = f"Error reading PDF file: {str(e)}"
-        print(error_msg)
+        logger.error("%s", error_msg)
         return error_msg
 
+def save_upload(contents: bytes, filename: str) -> str:
+    """
+    Save an uploaded PDF under a content-derived name so uploads never collide
+    or escape the data directory; returns the path relative to the data directory
+    """
+    filename = f"{hashlib.sha256(contents).hexdigest()[:16]}_{os.path.basename(filename or 'upload.pdf')}"
+    relative_path = storage.shard_path(filename, "uploads")
+    with open(storage.prepare_path(relative_path), 'wb') as f:
+        f.write(contents)
+    storage.record_write(relative_path)
+    return relative_path
+
+def extract_text_from_pdf_bytes(contents: bytes) -> str:
+    """Extract text from in-memory PDF bytes, falling back to manual extraction"""
+    # pdfminer is imported on first use to keep it out of the web process's startup
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+    
+    # Try primary method: pdfminer high-level extraction
+    try:
+        text = pdfminer_extract_text(io.BytesIO(contents))
+        if is_valid_text(text):
+            logger.debug("Successfully extracted text using pdfminer high-level: %s characters", len(text))
+            return text
+    except Exception as e:
+        logger.warning("Primary PDF extraction failed: %s", e)
+    
+    # Fallback method: manual extraction with better error handling
+    try:
+        text = extract_text_manual(io.BytesIO(contents))
+        if is_valid_text(text):
+            logger.debug("Successfully extracted text using manual method: %s characters", len(text))
+            return text
+    except Exception as e:
+        logger.warning("Manual PDF extraction failed: %s", e)
+    
+    # Final fallback: return error message
+    error_msg = "Unable to extract text from PDF. The file may be corrupted, password-protected, or contain only images."
+    logger.warning("%s", error_msg)
+    return error_msg
+
 def extract_text_manual(pdf_file):
     """Manual PDF text extraction with better error handling"""
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.layout import LAParams
+    from pdfminer.converter import TextConverter
+    
     try:
         # Create resource manager
         rsrcmgr = PDFResourceManager()
@@ -77,7 +102,7 @@ def extract_text_manual(pdf_file):
         return text
         
     except Exception as e:
-        print(f"Manual extraction error: {e}")
+        logger.error("Manual extraction error: %s", e)
         return ""
 
 def is_valid_text(text: str) -> bool:
@@ -110,6 +135,12 @@ def extract_text(html_content: str) -> str:
     soup = BeautifulSoup(html_content, 'html.parser')
     return soup.get_text()
 
+def extract_document_text(document: dict) -> str:
+    """Extract text from a fetched document, routing PDFs to the binary parser"""
+    if document.get('kind') == 'pdf':
+        return extract_text_from_pdf_bytes(document['body'])
+    return extract_text(document['body'])
+
 def extract_pdf_metadata(pdf_text: str) -> dict:
     """Extract metadata from PDF text content"""
     metadata = {
@@ -226,6 +257,6 @@ def extract_pdf_metadata(pdf_text: str) -> dict:
                     break
                     
     except Exception as e:
-        print(f"Error extracting PDF metadata: {e}")
+        logger.error("Error extracting PDF metadata: %s", e)
     
     return metadata
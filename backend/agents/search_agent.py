@@ -1,4 +1,194 @@
+import sys
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf")
+CHUNK_SIZE = 64 * 1024
+
+CSL_JSON_MEDIA_TYPE = "application/vnd.citationstyles.csl+json"
+DOI_CACHE_SIZE = 1024
+
+ARXIV_URL_PATTERN = re.compile(
+    r'^https?://(?:www\.|export\.)?arxiv\.org/(?:abs|pdf)/([^?#]+?)(?:\.pdf)?/?(?:[?#].*)?$',
+    re.IGNORECASE
+)
+SEMANTIC_SCHOLAR_URL_PATTERN = re.compile(
+    r'^https?://(?:www\.)?semanticscholar\.org/paper/(?:[^/?#]+/)?([0-9a-f]{40})\b',
+    re.IGNORECASE
+)
+
+# Resolved DOI metadata, most recently used last; shared by the I/O threads
+_doi_metadata_cache = OrderedDict()
+_doi_metadata_lock = threading.Lock()
+
 def fetch_paper(url: str) -> str:
+    """Fetch a paper and return its text (HTML markup or text extracted from a PDF)"""
+    document = fetch_document(url)
+    if document['kind'] == 'pdf':
+        from agents import parser_agent
+        return parser_agent.extract_text_from_pdf_bytes(document['body'])
+    return document['body']
+
+def match_known_url(url: str):
+    """
+    Recognize URLs of services with structured APIs. Returns a
+    (service, identifier) tuple, or None for any other host.
+    """
+    url = url.strip()
+    match = ARXIV_URL_PATTERN.match(url)
+    if match:
+        return 'arxiv', match.group(1)
+    match = SEMANTIC_SCHOLAR_URL_PATTERN.match(url)
+    if match:
+        return 'semantic_scholar', match.group(1).lower()
+    return None
+
+def fetch_document(url: str, max_bytes: int = None) -> dict:
+    """
+    Stream a paper from a URL and sniff whether it is a PDF or an HTML page.
+    PDFs are returned as a bytearray and HTML pages as decoded text.
+    """
     import requests
-    response = requests.get(url)
-    return response.text
+
+    if max_bytes is None:
+        max_bytes = Config.get_max_fetch_bytes()
+
+    try:
+        response = requests.get(url, stream=True, timeout=Config.get_fetch_timeout())
+    except requests.RequestException:
+        metrics.UPSTREAM_ERRORS.inc(upstream="fetch")
+        raise
+    if response.status_code >= 500:
+        metrics.UPSTREAM_ERRORS.inc(upstream="fetch")
+    with response:
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+
+        # Reject oversized bodies before downloading them when the server tells us the size
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            raise ValueError(f"Document at {url} is larger than the {max_bytes} byte limit")
+
+        # One growing buffer, so the body is not copied again once the download ends
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if len(body) + len(chunk) > max_bytes:
+                raise ValueError(f"Document at {url} is larger than the {max_bytes} byte limit")
+            body += chunk
+
+        encoding = response.encoding
+        final_url = response.url
+
+    size = len(body)
+    kind = sniff_document_kind(body, content_type)
+    if kind == 'html':
+        body = body.decode(encoding or 'utf-8', errors='replace')
+
+    return {
+        'kind': kind,
+        'body': body,
+        'content_type': content_type,
+        'url': final_url,
+        'size': size
+    }
+
+def sniff_document_kind(body: bytes, content_type: str = "") -> str:
+    """Decide whether a body is a PDF or HTML using magic bytes, then the Content-Type header"""
+    # PDF readers accept the header anywhere in the first 1024 bytes
+    if body.find(PDF_MAGIC, 0, 1024) != -1:
+        return 'pdf'
+    if content_type in PDF_CONTENT_TYPES and not body.lstrip()[:1] == b"<":
+        return 'pdf'
+    return 'html'
+
+def normalize_doi(doi: str) -> str:
+    """Strip resolver prefixes from a DOI and lowercase it (DOIs are case-insensitive)"""
+    doi = doi.strip()
+    doi = re.sub(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', '', doi, flags=re.IGNORECASE)
+    return doi.lower()
+
+def resolve_doi_metadata(doi: str) -> dict:
+    """
+    Resolve citation metadata for a DOI by asking the DOI registry for CSL-JSON.
+    Results are cached per DOI. Returns an empty dict if the DOI cannot be resolved.
+    """
+    key = normalize_doi(doi)
+    with _doi_metadata_lock:
+        cached = _doi_metadata_cache.get(key)
+        if cached is not None:
+            _doi_metadata_cache.move_to_end(key)
+    if cached is not None:
+        metrics.CACHE_REQUESTS.inc(cache="doi", result="hit")
+        return copy_source_info(cached)
+    metrics.CACHE_REQUESTS.inc(cache="doi", result="miss")
+
+    import requests
+    try:
+        response = requests.get(
+            f"{Config.get_doi_resolver_url()}/{key}",
+            headers={'Accept': CSL_JSON_MEDIA_TYPE},
+            timeout=Config.get_fetch_timeout()
+        )
+        response.raise_for_status()
+        metadata = csl_to_source_info(response.json(), key)
+    except Exception as e:
+        logger.warning("DOI metadata lookup failed for %s: %s", key, e)
+        metrics.UPSTREAM_ERRORS.inc(upstream="doi_registry")
+        return {}
+
+    with _doi_metadata_lock:
+        _doi_metadata_cache[key] = metadata
+        if len(_doi_metadata_cache) > DOI_CACHE_SIZE:
+            _doi_metadata_cache.popitem(last=False)
+    return copy_source_info(metadata)
+
+def csl_to_source_info(csl: dict, doi: str = "") -> dict:
+    """Map a CSL-JSON record onto the source_info fields used for citations"""
+    authors = []
+    for author in csl.get('author', []):
+        name = author.get('literal') or f"{author.get('given', '')} {author.get('family', '')}".strip()
+        if name:
+            authors.append(name)
+
+    year = 'Unknown Year'
+    for field in ('issued', 'published-print', 'published-online', 'created'):
+        date_parts = csl.get(field, {}).get('date-parts') or [[]]
+        if date_parts[0] and date_parts[0][0]:
+            year = str(date_parts[0][0])
+            break
+
+    doi = csl.get('DOI') or doi
+    abstract = first_csl_value(csl.get('abstract'))
+    # Crossref abstracts are JATS XML fragments
+    abstract = re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', abstract)).strip()
+
+    return {
+        'title': first_csl_value(csl.get('title')) or 'Unknown Title',
+        'authors': authors or ['Unknown Author'],
+        'year': year,
+        'journal': first_csl_value(csl.get('container-title')) or first_csl_value(csl.get('publisher')) or 'Unknown Journal',
+        'doi': doi,
+        'url': csl.get('URL') or f"https://doi.org/{doi}",
+        'abstract': abstract
+    }
+
+def first_csl_value(value) -> str:
+    """CSL-JSON string fields are sometimes lists; return the first non-empty string"""
+    if isinstance(value, list):
+        value = next((item for item in value if item), '')
+    return value.strip() if isinstance(value, str) else ''
+
+def copy_source_info(metadata: dict) -> dict:
+    """Copy cached metadata so callers can add request-specific fields"""
+    source_info = dict(metadata)
+    source_info['authors'] = list(metadata['authors'])
+    return source_info
@@ -1,59 +1,101 @@
 import sys
 import os
 import re
+import threading
+import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Loaded once per process; building the pipeline reloads the model weights
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+def get_summarizer():
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            from transformers import pipeline
+            
+            # Initialize the summarization pipeline with caching
+            cache_dir = Config.get_model_cache_dir()
+            _summarizer = pipeline(
+                "summarization", 
+                model="facebook/bart-large-cnn",
+                cache_dir=cache_dir
+            )
+        return _summarizer
 
 def generate_summary(text: str) -> str:
+    return generate_summaries([text])[0]
+
+def generate_summaries(texts: list) -> list:
+    """
+    Summarize several texts with one batched model call. Each result is a
+    summary or an error message, exactly as generate_summary would return.
+    """
+    summaries = [None] * len(texts)
+    batch = []
+    for index, text in enumerate(texts):
+        with metrics.STAGE_SECONDS.time(pipeline="summarizer", stage="quality_check"):
+            cleaned_text, error = prepare_summary_input(text)
+        if error:
+            summaries[index] = error
+        else:
+            batch.append((index, cleaned_text))
+    if not batch:
+        return summaries
+    
     try:
-        # Validate input text
-        if not text or not isinstance(text, str):
-            return "Error: Invalid text provided for summarization."
-        
-        # Check if text is an error message or contains garbled content
-        if text.startswith("Error:") or text.startswith("Unable to extract"):
-            return f"Document Processing Error: {text}"
-        
-        # Check for garbled or binary content
-        if is_garbled_text(text):
-            return "Error: The document contains unreadable or binary content that cannot be summarized."
-        
-        # Clean the text for better summarization
-        cleaned_text = clean_text_for_summarization(text)
-        
-        if len(cleaned_text.strip()) < 100:
-            return "Error: The document contains insufficient readable text for summarization."
-        
-        from transformers import pipeline
-        
-        # Initialize the summarization pipeline with caching
-        cache_dir = Config.get_model_cache_dir()
-        summarizer = pipeline(
-            "summarization", 
-            model="facebook/bart-large-cnn",
-            cache_dir=cache_dir
+        summarizer = get_summarizer()
+        # Generate summaries
+        results = summarizer(
+            [cleaned_text for _, cleaned_text in batch],
+            max_length=130, min_length=30, do_sample=False,
+            batch_size=len(batch)
         )
-        
-        # Truncate text if it's too long (BART has input length limits)
-        max_input_length = 1024
-        if len(cleaned_text) > max_input_length:
-            cleaned_text = cleaned_text[:max_input_length]
-        
-        # Generate summary
-        result = summarizer(cleaned_text, max_length=130, min_length=30, do_sample=False)
-        summary = result[0]['summary_text']
-        
-        # Validate the generated summary
-        if len(summary.strip()) < 20:
-            return "Error: Generated summary is too short or empty."
-        
-        return summary
-        
+        for (index, _), result in zip(batch, results):
+            summary = result['summary_text']
+            # Validate the generated summary
+            if len(summary.strip()) < 20:
+                summary = "Error: Generated summary is too short or empty."
+            summaries[index] = summary
     except Exception as e:
         # Fallback to simple text analysis if summarization fails
-        print(f"Summarization error: {e}")
-        return create_fallback_summary(text)
+        logger.error("Summarization error: %s", e)
+        metrics.FALLBACKS.inc(len(batch), kind="summary")
+        for index, _ in batch:
+            summaries[index] = create_fallback_summary(texts[index])
+    return summaries
+
+def prepare_summary_input(text: str) -> tuple:
+    """Cleaned model input for text, or (None, error message) if it cannot be summarized"""
+    # Validate input text
+    if not text or not isinstance(text, str):
+        return None, "Error: Invalid text provided for summarization."
+    
+    # Check if text is an error message or contains garbled content
+    if text.startswith("Error:") or text.startswith("Unable to extract"):
+        return None, f"Document Processing Error: {text}"
+    
+    # Check for garbled or binary content
+    if is_garbled_text(text):
+        return None, "Error: The document contains unreadable or binary content that cannot be summarized."
+    
+    # Clean the text for better summarization
+    cleaned_text = clean_text_for_summarization(text)
+    
+    if len(cleaned_text.strip()) < 100:
+        return None, "Error: The document contains insufficient readable text for summarization."
+    
+    # Truncate text if it's too long (BART has input length limits)
+    max_input_length = 1024
+    if len(cleaned_text) > max_input_length:
+        cleaned_text = cleaned_text[:max_input_length]
+    return cleaned_text, None
 
 def clean_text_for_summarization(text: str) -> str:
     """Clean text for better summarization results"""
@@ -1,91 +1,220 @@
 import requests
 import json
 import re
-from typing import List, Dict, Any
+import time
+import logging
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 import xml.etree.ElementTree as ET
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def search_arxiv_papers(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+ATOM_ENTRY = f"{ATOM_NS}entry"
+ATOM_ID = f"{ATOM_NS}id"
+ATOM_TITLE = f"{ATOM_NS}title"
+ATOM_SUMMARY = f"{ATOM_NS}summary"
+ATOM_PUBLISHED = f"{ATOM_NS}published"
+ATOM_AUTHOR = f"{ATOM_NS}author"
+ATOM_NAME = f"{ATOM_NS}name"
+ATOM_CATEGORY = f"{ATOM_NS}category"
+ARXIV_PRIMARY_CATEGORY = f"{ARXIV_NS}primary_category"
+ARXIV_DOI = f"{ARXIV_NS}doi"
+OPENSEARCH_TOTAL_RESULTS = f"{OPENSEARCH_NS}totalResults"
+
+ARXIV_PAGE_SIZE = 100
+ARXIV_PAGE_DELAY = 3  # seconds between paged requests, as asked by the arXiv API guidelines
+
+def search_arxiv_papers(query: str, max_results: int = 10, start: int = 0) -> List[Dict[str, Any]]:
     """
     Search for papers on arXiv using their free API
     """
     try:
-        # arXiv API endpoint
-        url = "http://export.arxiv.org/api/query"
+        return list(iter_arxiv_papers(query, max_results, start))
+    except Exception as e:
+        logger.error("Error searching arXiv: %s", e)
+        metrics.UPSTREAM_ERRORS.inc(upstream="arxiv")
+        return []
+
+def iter_arxiv_papers(query: str, max_results: int = 10, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield arXiv search results as they are parsed, paging through `start`
+    when more than one page of results is requested
+    """
+    remaining = max_results
+    offset = start
+    while remaining > 0:
+        page_size = min(remaining, ARXIV_PAGE_SIZE)
         params = {
             'search_query': f'all:"{query}"',
-            'start': 0,
-            'max_results': max_results,
+            'start': offset,
+            'max_results': page_size,
             'sortBy': 'relevance',
             'sortOrder': 'descending'
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        # Parse XML response
-        root = ET.fromstring(response.content)
-        
-        # Extract papers
-        papers = []
-        for entry in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
-            paper = {
-                'title': entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip(),
-                'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text 
-                           for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
-                'summary': entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip(),
-                'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
-                'arxiv_id': entry.find('.//{http://www.w3.org/2005/Atom}id').text.split('/')[-1],
-                'categories': [cat.text for cat in entry.findall('.//{http://arxiv.org/schemas/atom}category')],
-                'pdf_url': f"https://arxiv.org/pdf/{entry.find('.//{http://www.w3.org/2005/Atom}id').text.split('/')[-1]}.pdf"
-            }
-            papers.append(paper)
-        
-        return papers
+        with requests.get(Config.get_arxiv_api_url(), params=params, stream=True,
+                          timeout=Config.get_fetch_timeout()) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            feed = {}
+            count = 0
+            for paper in parse_arxiv_feed(response.raw, feed):
+                count += 1
+                yield paper
+        
+        offset += count
+        remaining -= count
+        # Stop on a short page or once the feed reports no further results
+        if count < page_size or offset >= feed.get('total_results', offset + 1):
+            break
+        time.sleep(ARXIV_PAGE_DELAY)
+
+def fetch_arxiv_paper(arxiv_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a single arXiv paper by ID through the API's id_list parameter
+    """
+    try:
+        params = {'id_list': arxiv_id, 'max_results': 1}
+        with requests.get(Config.get_arxiv_api_url(), params=params, stream=True,
+                          timeout=Config.get_fetch_timeout()) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            for paper in parse_arxiv_feed(response.raw):
+                # Unknown IDs come back as a single entry titled "Error"
+                if paper['arxiv_id'] and paper['title'] != 'Error':
+                    return paper
+        return None
     except Exception as e:
-        print(f"Error searching arXiv: {e}")
-        return []
+        logger.error("Error fetching arXiv paper %s: %s", arxiv_id, e)
+        metrics.UPSTREAM_ERRORS.inc(upstream="arxiv")
+        return None
 
-def search_semantic_scholar_papers(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+def parse_arxiv_feed(source, feed: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse an arXiv Atom feed from a file-like object, yielding
+    one paper record per completed entry. Feed-level values such as the
+    total result count are written into `feed` when it is provided.
+    """
+    context = ET.iterparse(source, events=('start', 'end'))
+    _, root = next(context)
+    
+    for event, elem in context:
+        if event != 'end':
+            continue
+        if elem.tag == ATOM_ENTRY:
+            yield parse_arxiv_entry(elem)
+            # Drop parsed entries so memory stays flat for large feeds
+            root.clear()
+        elif elem.tag == OPENSEARCH_TOTAL_RESULTS and feed is not None:
+            feed['total_results'] = int(elem.text or 0)
+
+def parse_arxiv_entry(entry: ET.Element) -> Dict[str, Any]:
+    """
+    Build a paper record from a single Atom entry using direct child lookups
+    """
+    entry_id = entry.findtext(ATOM_ID, '').strip()
+    arxiv_id = entry_id.split('/abs/')[-1]
+    primary_category = entry.find(ARXIV_PRIMARY_CATEGORY)
+    
+    return {
+        'title': entry.findtext(ATOM_TITLE, '').strip(),
+        'authors': [author.findtext(ATOM_NAME, '') for author in entry.iterfind(ATOM_AUTHOR)],
+        'summary': entry.findtext(ATOM_SUMMARY, '').strip(),
+        'published': entry.findtext(ATOM_PUBLISHED, ''),
+        'arxiv_id': arxiv_id,
+        'categories': [cat.get('term') for cat in entry.iterfind(ATOM_CATEGORY) if cat.get('term')],
+        'primary_category': primary_category.get('term', '') if primary_category is not None else '',
+        'doi': entry.findtext(ARXIV_DOI, ''),
+        'pdf_url': f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+    }
+
+SEMANTIC_SCHOLAR_FIELDS = 'title,authors.name,abstract,year,venue,url,paperId,externalIds,openAccessPdf'
+SEMANTIC_SCHOLAR_HEADERS = {
+    'User-Agent': 'Research-Synthesis-App/1.0'
+}
+
+def search_semantic_scholar_papers(query: str, max_results: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Search for papers using Semantic Scholar API (free tier)
     """
     try:
-        url = "https://api.semanticscholar.org/graph/v1/paper/search"
-        params = {
-            'query': query,
-            'limit': max_results,
-            'fields': 'title,authors.name,abstract,year,venue,url,paperId'
-        }
-        
-        headers = {
-            'User-Agent': 'Research-Synthesis-App/1.0'
-        }
-        
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        
-        data = response.json()
-        papers = []
-        
-        for paper in data.get('data', []):
-            paper_info = {
-                'title': paper.get('title', ''),
-                'authors': [author.get('name', '') for author in paper.get('authors', [])],
-                'summary': paper.get('abstract', ''),
-                'year': paper.get('year', ''),
-                'venue': paper.get('venue', ''),
-                'url': paper.get('url', ''),
-                'paper_id': paper.get('paperId', ''),
-                'source': 'semantic_scholar'
-            }
-            papers.append(paper_info)
-        
-        return papers
+        return list(iter_semantic_scholar_papers(query, max_results, offset))
     except Exception as e:
-        print(f"Error searching Semantic Scholar: {e}")
+        logger.error("Error searching Semantic Scholar: %s", e)
+        metrics.UPSTREAM_ERRORS.inc(upstream="semantic_scholar")
         return []
 
+def iter_semantic_scholar_papers(query: str, max_results: int = 10, offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one page of Semantic Scholar search results, raising on HTTP
+    errors (e.g. 429 rate limits) instead of returning a short page
+    """
+    url = f"{Config.get_semantic_scholar_api_url()}/paper/search"
+    params = {
+        'query': query,
+        'offset': offset,
+        'limit': max_results,
+        'fields': SEMANTIC_SCHOLAR_FIELDS
+    }
+    
+    response = requests.get(url, params=params, headers=SEMANTIC_SCHOLAR_HEADERS,
+                            timeout=Config.get_fetch_timeout())
+    response.raise_for_status()
+    
+    data = response.json()
+    for paper in data.get('data', []):
+        yield parse_semantic_scholar_paper(paper)
+
+def fetch_semantic_scholar_paper(paper_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a single paper on Semantic Scholar by paperId
+    """
+    try:
+        url = f"{Config.get_semantic_scholar_api_url()}/paper/{paper_id}"
+        response = requests.get(url, params={'fields': SEMANTIC_SCHOLAR_FIELDS}, headers=SEMANTIC_SCHOLAR_HEADERS,
+                                timeout=Config.get_fetch_timeout())
+        response.raise_for_status()
+        return parse_semantic_scholar_paper(response.json())
+    except Exception as e:
+        logger.error("Error fetching Semantic Scholar paper %s: %s", paper_id, e)
+        metrics.UPSTREAM_ERRORS.inc(upstream="semantic_scholar")
+        return None
+
+def parse_semantic_scholar_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a paper record from a Semantic Scholar Graph API paper object
+    """
+    external_ids = paper.get('externalIds') or {}
+    open_access_pdf = paper.get('openAccessPdf') or {}
+    paper_info = {
+        'title': paper.get('title', ''),
+        'authors': [author.get('name', '') for author in paper.get('authors', [])],
+        'summary': paper.get('abstract') or '',
+        'year': paper.get('year', ''),
+        'venue': paper.get('venue', ''),
+        'url': paper.get('url', ''),
+        'paper_id': paper.get('paperId', ''),
+        'doi': external_ids.get('DOI', ''),
+        'pdf_url': open_access_pdf.get('url', ''),
+        'source': 'semantic_scholar'
+    }
+    if external_ids.get('ArXiv'):
+        paper_info['arxiv_id'] = external_ids['ArXiv']
+        if not paper_info['pdf_url']:
+            paper_info['pdf_url'] = f"https://arxiv.org/pdf/{external_ids['ArXiv']}.pdf"
+    return paper_info
+
 def extract_key_insights(text: str) -> List[str]:
     """
     Extract key insights from text using pattern matching
@@ -190,7 +319,7 @@ def synthesize_papers(papers: List[Dict[str, Any]], synthesis_type: str = "compr
                 synthesis = "Error: Generated synthesis is empty"
                 
         except Exception as synthesis_error:
-            print(f"Error generating synthesis: {synthesis_error}")
+            logger.error("Error generating synthesis: %s", synthesis_error)
             synthesis = f"Error generating synthesis: {str(synthesis_error)}"
         
         # Final validation - ensure synthesis is never None
@@ -208,7 +337,7 @@ def synthesize_papers(papers: List[Dict[str, Any]], synthesis_type: str = "compr
         }
         
     except Exception as e:
-        print(f"Error in synthesis: {e}")
+        logger.error("Error in synthesis: %s", e)
         return {
             'synthesis': f"Error generating synthesis: {str(e)}",
             'paper_analyses': [],
@@ -290,7 +419,7 @@ def generate_comprehensive_synthesis(paper_analyses: List[Dict], common_themes:
         return result
         
     except Exception as e:
-        print(f"Error in comprehensive synthesis: {e}")
+        logger.error("Error in comprehensive synthesis: %s", e)
         return f"Error generating comprehensive synthesis: {str(e)}"
 
 def generate_comparative_synthesis(paper_analyses: List[Dict]) -> str:
@@ -329,7 +458,7 @@ def generate_comparative_synthesis(paper_analyses: List[Dict]) -> str:
         return synthesis
         
     except Exception as e:
-        print(f"Error in comparative synthesis: {e}")
+        logger.error("Error in comparative synthesis: %s", e)
         return f"Error generating comparative synthesis: {str(e)}"
 
 def generate_thematic_synthesis(paper_analyses: List[Dict], common_themes: List[str]) -> str:
@@ -365,7 +494,7 @@ def generate_thematic_synthesis(paper_analyses: List[Dict], common_themes: List[
         return synthesis
         
     except Exception as e:
-        print(f"Error in thematic synthesis: {e}")
+        logger.error("Error in thematic synthesis: %s", e)
         return f"Error generating thematic synthesis: {str(e)}"
 
 def synthesize(papers: list[str]) -> str:
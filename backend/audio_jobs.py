@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import executors
+import logging_config
+import metrics
+from config import Config
+from agents import audio_agent
+
+logger = logging.getLogger(__name__)
+
+# Audio jobs by ID, oldest first: {'job_id', 'status', 'audio', 'error', 'created_at', 'finished_at'}
+# status is one of 'pending', 'ready', 'failed'
+_jobs = OrderedDict()
+# Progressive MP3 frames per job for streaming while synthesis runs:
+# job_id -> {'parts': [bytes], 'attempt': int, 'size': int, 'done': bool}
+# Frames are dropped once the job finishes; readers continue from the file.
+_streams = {}
+# Narration texts registered by the pipelines, synthesized on first request:
+# narration ID (a hash of the text, also used as its job ID) -> text
+_narrations = OrderedDict()
+_pending_count = 0
+_lock = threading.Lock()
+# Stream readers waiting for a job to gain frames or finish, as
+# (event loop, asyncio.Event) pairs per job ID; woken from the TTS threads
+_readers = {}
+_executor = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Worker pool for TTS, created on first use"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.get_audio_workers(),
+                thread_name_prefix="audio"
+            )
+        return _executor
+
+def register_narration(text: str) -> str:
+    """
+    Remember text for narration and return its deterministic ID. Nothing is
+    synthesized until the audio is first requested (see request_narration).
+    """
+    narration_id = hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()[:32]
+    with _lock:
+        _narrations[narration_id] = text
+        _narrations.move_to_end(narration_id)
+        while len(_narrations) > Config.get_narration_store_size():
+            _narrations.popitem(last=False)
+    return narration_id
+
+def get_narration_text(narration_id: str) -> Optional[str]:
+    with _lock:
+        return _narrations.get(narration_id)
+
+def request_narration(narration_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Snapshot of the audio job for an ID, starting synthesis of a registered
+    narration if no usable job exists yet. Concurrent requests for the same
+    narration share one job. Returns None if the ID is unknown.
+    """
+    with _lock:
+        job = _jobs.get(narration_id)
+        text = _narrations.get(narration_id)
+        if text is None or (job is not None and job_is_usable(job)):
+            return dict(job) if job else None
+        _narrations.move_to_end(narration_id)
+        queue_full = create_job(narration_id)
+    start_job(narration_id, text, queue_full)
+    return get_audio_job(narration_id)
+
+def job_is_usable(job: Dict[str, Any]) -> bool:
+    """Pending, or ready with its file still on disk (it may have been evicted)"""
+    if job['status'] == 'pending':
+        return True
+    return job['status'] == 'ready' and os.path.exists(job['audio'])
+
+def create_job(job_id: str) -> bool:
+    """Add a pending job and return whether the queue is full; caller holds the lock"""
+    global _pending_count
+    _jobs[job_id] = {
+        'job_id': job_id,
+        'status': 'pending',
+        'audio': '',
+        'error': '',
+        'created_at': datetime.now().isoformat(),
+        'finished_at': None
+    }
+    _jobs.move_to_end(job_id)
+    trim_finished_jobs()
+    queue_full = _pending_count >= Config.get_audio_queue_size()
+    if not queue_full:
+        _pending_count += 1
+        _streams[job_id] = {'parts': [], 'attempt': 0, 'size': 0, 'done': False}
+    return queue_full
+
+def start_job(job_id: str, text: str, queue_full: bool):
+    if queue_full:
+        logger.warning("Audio queue is full, rejecting job %s", job_id)
+        finish_job(job_id, '', "Audio queue is full, try again later", counted=False)
+    else:
+        get_executor().submit(run_audio_job, job_id, text)
+
+def run_audio_job(job_id: str, text: str):
+    # Pool threads carry no request context; tag this job's log lines instead
+    logging_config.job_id_var.set(job_id)
+    audio_path = ""
+    error = ""
+    try:
+        with metrics.STAGE_SECONDS.time(pipeline="audio", stage="tts"):
+            audio_path = audio_agent.generate_audio(
+                text,
+                on_chunk=lambda index, frames: record_progress(job_id, index, frames)
+            )
+        if not audio_path:
+            error = "Audio generation failed"
+        elif not os.path.exists(audio_path):
+            logger.warning("Audio file not found at %s", audio_path)
+            audio_path = ""
+            error = "Audio file was not created"
+    except Exception as e:
+        logger.exception("Audio job %s failed: %s", job_id, e)
+        error = str(e)
+    finish_job(job_id, audio_path, error)
+
+def finish_job(job_id: str, audio_path: str, error: str, counted: bool = True):
+    global _pending_count
+    with _lock:
+        if counted:
+            _pending_count -= 1
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job['status'] = 'ready' if audio_path else 'failed'
+        job['audio'] = audio_path
+        job['error'] = error
+        job['finished_at'] = datetime.now().isoformat()
+        stream = _streams.get(job_id)
+        if stream is not None:
+            stream['parts'] = []
+            stream['done'] = True
+        wake_readers(job_id)
+
+def record_progress(job_id: str, index: int, frames: bytes):
+    """Append a finished chunk's frames; index 0 starts a new attempt and drops earlier frames"""
+    with _lock:
+        stream = _streams.get(job_id)
+        if stream is None:
+            return
+        if index == 0 and stream['size']:
+            stream['parts'] = []
+            stream['size'] = 0
+            stream['attempt'] += 1
+        stream['parts'].append(frames)
+        stream['size'] += len(frames)
+        wake_readers(job_id)
+
+def wake_readers(job_id: str):
+    """Wake the stream readers waiting on a job; caller holds the lock"""
+    for loop, event in _readers.get(job_id, ()):
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The reader's event loop has closed
+            pass
+
+async def wait_for_progress(job_id: str, sent_parts: int, wait_timeout: float):
+    """Wait until the job has frames beyond sent_parts or finishes, without holding a thread"""
+    event = asyncio.Event()
+    reader = (asyncio.get_running_loop(), event)
+    with _lock:
+        stream = _streams.get(job_id)
+        if stream is None or stream['done'] or sent_parts != len(stream['parts']):
+            return
+        # Registered under the lock, so progress recorded after the check still wakes us
+        _readers.setdefault(job_id, set()).add(reader)
+    try:
+        await asyncio.wait_for(event.wait(), wait_timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with _lock:
+            readers = _readers.get(job_id)
+            if readers is not None:
+                readers.discard(reader)
+                if not readers:
+                    del _readers[job_id]
+
+async def iter_job_audio(job_id: str, wait_timeout: float = 30.0):
+    """
+    Yield a job's MP3 frames as chunks are synthesized, then the rest of the
+    finished file. If synthesis restarts on another engine, or the file is
+    not the audio that was streamed (the fallback narration), a reader that
+    already sent frames stops early rather than splice mismatched audio.
+    """
+    sent_parts = 0
+    sent_bytes = 0
+    attempt = None
+    while True:
+        await wait_for_progress(job_id, sent_parts, wait_timeout)
+        with _lock:
+            stream = _streams.get(job_id)
+            job = _jobs.get(job_id)
+            if stream is None or stream['done']:
+                audio_path = job['audio'] if job else ''
+                streamed_size = stream['size'] if stream else 0
+                restarted = stream is not None and attempt is not None and stream['attempt'] != attempt
+                break
+            if attempt is not None and stream['attempt'] != attempt:
+                if sent_bytes:
+                    return
+                sent_parts = 0
+            attempt = stream['attempt']
+            new_parts = stream['parts'][sent_parts:]
+            sent_parts += len(new_parts)
+        for frames in new_parts:
+            sent_bytes += len(frames)
+            yield frames
+
+    if not audio_path:
+        return
+    if sent_bytes and (restarted or os.path.getsize(audio_path) != streamed_size):
+        return
+    with open(audio_path, 'rb') as f:
+        f.seek(sent_bytes)
+        while True:
+            block = await executors.run_io(f.read, 64 * 1024)
+            if not block:
+                return
+            yield block
+
+def trim_finished_jobs():
+    """Forget the oldest finished jobs beyond the retention limit; caller holds the lock"""
+    excess = len(_jobs) - Config.get_audio_job_retention()
+    if excess <= 0:
+        return
+    for job_id in [job_id for job_id, job in _jobs.items() if job['status'] != 'pending'][:excess]:
+        del _jobs[job_id]
+        _streams.pop(job_id, None)
+
+def get_audio_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Snapshot of a job's state, or None if the ID is unknown. A registered
+    narration that has not been requested yet reports status 'idle'.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job:
+            return dict(job)
+        if job_id in _narrations:
+            return {'job_id': job_id, 'status': 'idle', 'audio': '', 'error': '',
+                    'created_at': None, 'finished_at': None}
+        return None
+
+def pending_job_count() -> int:
+    return _pending_count
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item calls into batched calls. Items submitted
+    within max_wait seconds of each other (up to max_size) are passed together
+    to func(items) -> results, which runs through run(func, items), e.g.
+    executors.run_model. Each caller gets the result at its own position.
+    """
+    def __init__(self, name: str, func: Callable[[List[Any]], List[Any]], run: Callable,
+                 max_size: Callable[[], int], max_wait: Callable[[], float]):
+        self.name = name
+        self.func = func
+        self.run = run
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size():
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait(), self.flush)
+        return await future
+
+    def pending_count(self) -> int:
+        """Items waiting for the current batch to fill or time out"""
+        return len(self._pending)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self.run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def run_batch(self, batch: list):
+        logger.debug("%s: running a batch of %s", self.name, len(batch))
+        try:
+            results = await self.run(self.func, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
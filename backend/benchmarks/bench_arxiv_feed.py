@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark arXiv Atom feed parsing: streaming iterparse vs. the old fromstring + descendant search
+"""
+
+import io
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.synthesizer_agent import parse_arxiv_feed
+
+ENTRY_COUNTS = [100, 1000]
+REPEATS = 5
+
+def build_feed(entries: int) -> bytes:
+    """Build a synthetic arXiv Atom feed with the given number of entries"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+        f'<opensearch:totalResults>{entries}</opensearch:totalResults>\n'
+    ]
+    for i in range(entries):
+        parts.append(
+            '<entry>\n'
+            f'<id>http://arxiv.org/abs/2305.{i:05d}v1</id>\n'
+            '<published>2023-05-24T17:59:59Z</published>\n'
+            f'<title>Synthetic Paper Number {i} on Machine Learning</title>\n'
+            f'<summary>{"This paper studies deep learning models and their performance. " * 15}</summary>\n'
+            '<author><name>Author A</name></author>\n'
+            '<author><name>Author B</name></author>\n'
+            '<author><name>Author C</name></author>\n'
+            '<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+            '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+            '<category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>\n'
+            '</entry>\n'
+        )
+    parts.append('</feed>\n')
+    return ''.join(parts).encode('utf-8')
+
+def parse_feed_legacy(content: bytes) -> list:
+    """The previous parser: full tree plus repeated descendant searches per field"""
+    root = ET.fromstring(content)
+    papers = []
+    for entry in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
+        papers.append({
+            'title': entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip(),
+            'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text
+                        for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
+            'summary': entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip(),
+            'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
+            'arxiv_id': entry.find('.//{http://www.w3.org/2005/Atom}id').text.split('/')[-1],
+            'categories': [cat.text for cat in entry.findall('.//{http://arxiv.org/schemas/atom}category')],
+            'pdf_url': f"https://arxiv.org/pdf/{entry.find('.//{http://www.w3.org/2005/Atom}id').text.split('/')[-1]}.pdf"
+        })
+    return papers
+
+def parse_feed_streaming(content: bytes) -> list:
+    return list(parse_arxiv_feed(io.BytesIO(content)))
+
+def best_time(func, content: bytes) -> tuple:
+    best = float('inf')
+    result = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    return best, len(result)
+
+def run_benchmark():
+    print("arXiv feed parsing benchmark")
+    print("=" * 60)
+    for entries in ENTRY_COUNTS:
+        content = build_feed(entries)
+        legacy_time, legacy_count = best_time(parse_feed_legacy, content)
+        streaming_time, streaming_count = best_time(parse_feed_streaming, content)
+        print(f"\n{entries} entries ({len(content) / 1024:.0f} KiB feed, best of {REPEATS})")
+        print(f"  fromstring + .// lookups: {legacy_time * 1000:8.2f} ms ({legacy_count} papers)")
+        print(f"  iterparse + child lookups: {streaming_time * 1000:8.2f} ms ({streaming_count} papers)")
+        print(f"  speedup: {legacy_time / streaming_time:.2f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Repeatable benchmark suite over the agents and the full pipelines
+
+Every case runs against the fixed corpus in corpus.py and records latency
+(min/median/mean/max over the repeats), throughput in the case's own unit
+and peak traced Python memory. Results are written as JSON so two runs can
+be compared:
+
+    python benchmarks/bench_suite.py run --output before.json
+    python benchmarks/bench_suite.py run --output after.json
+    python benchmarks/bench_suite.py compare before.json after.json
+
+Groups: micro (single agent functions), model (BART and other model
+calls) and macro (whole /upload/, /process-url/, /process-doi/ and
+synthesis pipelines). Upstream services are answered by the local
+upstream stand-in; cases whose dependencies are not installed are
+recorded as skipped.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+import corpus
+
+RESULTS_DIR = os.path.join(corpus.BENCHMARKS_DIR, "results")
+GROUPS = ("micro", "model", "macro")
+DEFAULT_REPEATS = {"micro": 10, "model": 3, "macro": 3}
+TOPICS = "Machine Learning,Biology,Physics,Economics"
+
+# (name, group, builder); builder() returns (func, units, unit) where func
+# runs one iteration and units is how much work that iteration covers
+CASES = []
+# Shared by the async cases so executors and batchers see one loop
+_loop = None
+
+def case(name: str, group: str = "micro"):
+    def register(builder):
+        CASES.append((name, group, builder))
+        return builder
+    return register
+
+def run_async(coroutine_function, *args, **kwargs):
+    return _loop.run_until_complete(coroutine_function(*args, **kwargs))
+
+# Micro: one agent function on one corpus document
+
+def build_pdf_extract(pdf_name: str):
+    from agents import parser_agent
+    contents = corpus.pdfs()[pdf_name]
+    return functools.partial(parser_agent.extract_text_from_pdf_bytes, contents), len(contents), "bytes"
+
+for _pdf_name in ["bundled"] + list(corpus.SYNTHETIC_PDF_PAGES):
+    CASES.append((f"parser.extract_text_from_pdf_bytes[{_pdf_name}]", "micro",
+                  functools.partial(build_pdf_extract, _pdf_name)))
+
+def build_html_extract(page_name: str):
+    from agents import parser_agent
+    page = corpus.landing_pages()[page_name]
+    return functools.partial(parser_agent.extract_text, page), len(page), "chars"
+
+def build_html_metadata(page_name: str):
+    import main
+    page = corpus.landing_pages()[page_name]
+    return functools.partial(main.extract_metadata_from_content, page, "https://example.org/paper"), len(page), "chars"
+
+for _page_name in corpus.landing_pages():
+    CASES.append((f"parser.extract_text[{_page_name}]", "micro", functools.partial(build_html_extract, _page_name)))
+    CASES.append((f"metadata.extract_metadata_from_content[{_page_name}]", "micro",
+                  functools.partial(build_html_metadata, _page_name)))
+
+@case("metadata.extract_pdf_metadata")
+def build_pdf_metadata():
+    from agents import parser_agent
+    text = corpus.paper_text()
+    return functools.partial(parser_agent.extract_pdf_metadata, text), len(text), "chars"
+
+@case("summarizer.prepare_summary_input")
+def build_quality_check():
+    from agents import summarizer_agent
+    text = corpus.paper_text()
+    return functools.partial(summarizer_agent.prepare_summary_input, text), len(text), "chars"
+
+@case("summarizer.create_fallback_summary")
+def build_fallback_summary():
+    from agents import summarizer_agent
+    text = corpus.paper_text()
+    return functools.partial(summarizer_agent.create_fallback_summary, text), len(text), "chars"
+
+@case("classifier.classify")
+def build_classify():
+    from agents import classifier_agent
+    text = corpus.paper_text()
+    return functools.partial(classifier_agent.classify, text, TOPICS.split(",")), 1, "documents"
+
+@case("synthesizer.parse_arxiv_feed")
+def build_feed_parse():
+    import io
+    from agents import synthesizer_agent
+    feed = corpus.arxiv_feed()
+    def parse():
+        return list(synthesizer_agent.parse_arxiv_feed(io.BytesIO(feed)))
+    return parse, len(parse()), "entries"
+
+def build_synthesis(synthesis_type: str):
+    import io
+    from agents import synthesizer_agent
+    papers = list(synthesizer_agent.parse_arxiv_feed(io.BytesIO(corpus.arxiv_feed())))
+    return functools.partial(synthesizer_agent.synthesize_papers, papers, synthesis_type), len(papers), "papers"
+
+for _synthesis_type in ("comprehensive", "comparative", "thematic"):
+    CASES.append((f"synthesizer.synthesize_papers[{_synthesis_type}]", "micro",
+                  functools.partial(build_synthesis, _synthesis_type)))
+
+@case("citations.generate_citation")
+def build_citation():
+    import main
+    source_info = main.extract_metadata_from_content(corpus.landing_pages()["landing_journal"], "https://example.org/paper")
+    return functools.partial(main.generate_citation, source_info, "all"), 1, "documents"
+
+@case("audio.split_into_tts_chunks")
+def build_tts_split():
+    from agents import audio_agent
+    from config import Config
+    text = corpus.paper_text(2)
+    return functools.partial(audio_agent.split_into_tts_chunks, text, Config.get_tts_chunk_chars()), len(text), "chars"
+
+@case("audio.synthesize_speech[standin]")
+def build_tts():
+    import tempfile
+    from agents import audio_agent
+    text = corpus.paper_text(1)[:1500]
+    audio_path = os.path.join(tempfile.mkdtemp(), "bench.mp3")
+    return functools.partial(audio_agent.synthesize_speech, text, audio_path), len(text), "chars"
+
+# Model: inference on the real weights
+
+@case("summarizer.generate_summaries[1]", "model")
+def build_summary():
+    from agents import summarizer_agent
+    texts = [corpus.paper_text()]
+    summarizer_agent.get_summarizer()
+    return functools.partial(summarizer_agent.generate_summaries, texts), len(texts), "texts"
+
+@case("summarizer.generate_summaries[8]", "model")
+def build_batched_summary():
+    from agents import summarizer_agent
+    texts = [corpus.paper_text(pages) for pages in range(4, 12)]
+    summarizer_agent.get_summarizer()
+    return functools.partial(summarizer_agent.generate_summaries, texts), len(texts), "texts"
+
+# Macro: whole pipelines as the endpoints run them, without caches
+
+def uncached_pipelines():
+    """Fresh pipelines with the stage cache off, so every iteration does the full work"""
+    import main
+    pipelines = main.build_pipelines(main.summarize_stage)
+    for pipeline in pipelines.values():
+        pipeline.cache = None
+    return pipelines
+
+def build_upload_pipeline(pdf_name: str):
+    import main
+    contents = corpus.pdfs()[pdf_name]
+    pipelines = uncached_pipelines()
+    return (functools.partial(run_async, main.run_upload, contents, f"{pdf_name}.pdf", TOPICS,
+                              pipelines=pipelines, refresh=True), 1, "requests")
+
+for _pdf_name in ["bundled"] + list(corpus.SYNTHETIC_PDF_PAGES):
+    CASES.append((f"pipeline.upload[{_pdf_name}]", "macro", functools.partial(build_upload_pipeline, _pdf_name)))
+
+@case("pipeline.process_url[landing_journal]", "macro")
+def build_url_pipeline():
+    import main
+    url = f"{corpus.serve_corpus()}/landing_journal.html"
+    pipelines = uncached_pipelines()
+    return functools.partial(run_async, main.run_process_url, url, TOPICS, pipelines=pipelines, refresh=True), 1, "requests"
+
+@case("pipeline.process_doi[standin]", "macro")
+def build_doi_pipeline():
+    import main
+    pipelines = uncached_pipelines()
+    return (functools.partial(run_async, main.run_process_doi, "10.5555/bench.2023.001", TOPICS,
+                              pipelines=pipelines, refresh=True), 1, "requests")
+
+@case("pipeline.synthesis[arxiv_feed]", "macro")
+def build_synthesis_pipeline():
+    import io
+    import main
+    from agents import synthesizer_agent
+    papers = list(synthesizer_agent.parse_arxiv_feed(io.BytesIO(corpus.arxiv_feed())))[:10]
+    return functools.partial(run_async, main.run_synthesis, papers, "comprehensive"), 1, "requests"
+
+def measure(func, repeats: int, units: float) -> dict:
+    """Time func over the repeats after one warm-up call, then trace one more call for peak memory"""
+    func()
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(durations)
+    return {
+        'repeats': repeats,
+        'min_seconds': min(durations),
+        'median_seconds': median,
+        'mean_seconds': statistics.mean(durations),
+        'max_seconds': max(durations),
+        'throughput_per_second': units / median if median else None,
+        'peak_memory_bytes': peak
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def prepare_environment():
+    """Point every upstream at a local stand-in and keep parsing in this process"""
+    global _loop
+    # main serves and stores files relative to the backend directory
+    os.chdir(BACKEND_DIR)
+    # Parsing in-process makes its allocations visible to tracemalloc and
+    # keeps process start-up out of the timings
+    os.environ.setdefault("CPU_WORKERS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if not os.getenv("UPSTREAM_STANDIN_URL"):
+        import upstream_standin
+        _, standin_url = upstream_standin.start_in_background(
+            port=0, fixtures_dir=os.path.join(corpus.CORPUS_DIR, "upstream"), quiet=True)
+        os.environ["UPSTREAM_STANDIN_URL"] = standin_url
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+def run_suite(args):
+    prepare_environment()
+    selected = [(name, group, builder) for name, group, builder in CASES
+                if group in args.group and (not args.filter or args.filter in name)]
+    results = {}
+    print(f"Running {len(selected)} benchmarks")
+    print("=" * 102)
+    print(f"{'benchmark':<58} {'median':>10} {'min':>10} {'throughput':>16} {'peak mem':>9}")
+    for name, group, builder in selected:
+        try:
+            func, units, unit = builder()
+            result = measure(func, args.repeats or DEFAULT_REPEATS[group], units)
+        except ImportError as e:
+            results[name] = {'group': group, 'skipped': f"missing dependency: {e.name or e}"}
+            print(f"{name:<58} skipped ({results[name]['skipped']})")
+            continue
+        except Exception as e:
+            results[name] = {'group': group, 'error': f"{type(e).__name__}: {e}"}
+            print(f"{name:<58} failed ({results[name]['error']})")
+            continue
+        result.update({'group': group, 'unit': unit})
+        results[name] = result
+        throughput = f"{result['throughput_per_second']:.1f} {unit}/s" if result['throughput_per_second'] else "-"
+        print(f"{name:<58} {result['median_seconds'] * 1000:>8.2f}ms {result['min_seconds'] * 1000:>8.2f}ms "
+              f"{throughput:>16} {result['peak_memory_bytes'] / 2**20:>7.1f}MB")
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+        'results': results
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit'] or 'nogit'}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"\nResults written to {output}")
+
+def compare_runs(args) -> int:
+    """Print per-benchmark changes between two runs; exit status 1 if any regressed"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    print(f"Baseline {baseline.get('commit') or '?'} ({baseline.get('created_at', '')}) vs "
+          f"current {current.get('commit') or '?'} ({current.get('created_at', '')})")
+    print("=" * 106)
+    print(f"{'benchmark':<58} {'before':>10} {'after':>10} {'change':>8} {'mem change':>11}")
+
+    regressions = []
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        before = baseline['results'].get(name, {})
+        after = current['results'].get(name, {})
+        if 'median_seconds' not in before or 'median_seconds' not in after:
+            state = "only in baseline" if name not in current['results'] else (
+                "new" if name not in baseline['results'] else "not measured in both runs")
+            print(f"{name:<58} {state}")
+            continue
+        change = after['median_seconds'] / before['median_seconds'] - 1 if before['median_seconds'] else 0.0
+        delta_ms = (after['median_seconds'] - before['median_seconds']) * 1000
+        memory_change = (after['peak_memory_bytes'] / before['peak_memory_bytes'] - 1
+                         if before['peak_memory_bytes'] else 0.0)
+        flags = []
+        # Sub-millisecond shifts are timer noise however large they are relatively
+        if change > args.threshold and delta_ms > args.min_delta_ms:
+            flags.append("SLOWER")
+        elif change < -args.threshold and -delta_ms > args.min_delta_ms:
+            flags.append("faster")
+        memory_delta_kb = (after['peak_memory_bytes'] - before['peak_memory_bytes']) / 1024
+        if memory_change > args.memory_threshold and memory_delta_kb > args.min_delta_kb:
+            flags.append("MORE MEMORY")
+        if "SLOWER" in flags or "MORE MEMORY" in flags:
+            regressions.append(name)
+        print(f"{name:<58} {before['median_seconds'] * 1000:>8.2f}ms {after['median_seconds'] * 1000:>8.2f}ms "
+              f"{change:>+7.1%} {memory_change:>+10.1%}  {' '.join(flags)}".rstrip())
+
+    print()
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agents and pipelines on a fixed corpus")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write a JSON report")
+    run_parser.add_argument("--group", action="append", choices=GROUPS,
+                            help="groups to run (repeatable, default: all)")
+    run_parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    run_parser.add_argument("--repeats", type=int, default=0,
+                            help="timed iterations per benchmark (default: 10 micro, 3 model/macro)")
+    run_parser.add_argument("--output", default="", help="report path (default: benchmarks/results/<time>-<commit>.json)")
+
+    compare_parser = commands.add_parser("compare", help="compare two reports and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative median slowdown that counts as a regression (default 0.10)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                                help="ignore changes smaller than this many milliseconds (default 1.0)")
+    compare_parser.add_argument("--memory-threshold", type=float, default=0.20,
+                                help="relative peak memory growth that counts as a regression (default 0.20)")
+    compare_parser.add_argument("--min-delta-kb", type=float, default=64,
+                                help="ignore peak memory changes smaller than this many KiB (default 64)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        args.group = args.group or list(GROUPS)
+        run_suite(args)
+    else:
+        sys.exit(compare_runs(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark TTS engines: latency and real-time factor (synthesis time / audio duration)
+
+Runs every engine that is available here. Restrict with TTS_ENGINES=gtts,espeak
+or point tts_service at the upstream stand-in with UPSTREAM_STANDIN_URL.
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.audio_agent import TTS_ENGINES, mp3_duration_seconds
+
+SENTENCE = "This paper presents a comprehensive analysis of machine learning applications in healthcare. "
+TEXT_LENGTHS = [100, 500, 2000]
+REPEATS = 3
+
+def benchmark_engine(engine, text: str) -> dict:
+    latencies = []
+    duration = 0.0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        audio = engine.synthesize(text, 'en', False)
+        latencies.append(time.perf_counter() - start)
+        duration = mp3_duration_seconds(audio)
+    latencies.sort()
+    median = latencies[len(latencies) // 2]
+    return {
+        'median_latency': median,
+        'best_latency': latencies[0],
+        'audio_seconds': duration,
+        'real_time_factor': median / duration if duration else float('inf')
+    }
+
+def run_benchmark():
+    print("TTS engine benchmark")
+    print("=" * 72)
+    names = os.getenv("TTS_ENGINES")
+    selected = [name.strip() for name in names.split(",")] if names else list(TTS_ENGINES)
+
+    for name in selected:
+        engine = TTS_ENGINES.get(name)
+        if engine is None or not engine.is_available():
+            print(f"\n{name}: not available, skipped")
+            continue
+        print(f"\n{name}")
+        print(f"  {'chars':>6} {'median s':>9} {'best s':>8} {'audio s':>8} {'RTF':>6}")
+        for length in TEXT_LENGTHS:
+            text = (SENTENCE * (length // len(SENTENCE) + 1))[:length]
+            try:
+                result = benchmark_engine(engine, text)
+            except Exception as e:
+                print(f"  {length:>6} failed: {e}")
+                continue
+            print(f"  {length:>6} {result['median_latency']:>9.3f} {result['best_latency']:>8.3f} "
+                  f"{result['audio_seconds']:>8.2f} {result['real_time_factor']:>6.3f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,124 @@
+"""
+Fixed benchmark corpus: the bundled paper, synthetic PDFs built on demand,
+and saved HTML landing pages and arXiv feeds under benchmarks/corpus/.
+Everything is deterministic so runs on different commits see the same input.
+"""
+
+import functools
+import os
+import random
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCHMARKS_DIR, "corpus")
+BUNDLED_PDF = os.path.join(os.path.dirname(BENCHMARKS_DIR), "data", "2305.15334v1.pdf")
+
+# Synthetic PDF sizes in pages
+SYNTHETIC_PDF_PAGES = {"synthetic_20p": 20, "synthetic_200p": 200}
+LINES_PER_PAGE = 50
+
+WORDS = (
+    "model data training results accuracy performance network learning method approach "
+    "analysis evaluation baseline dataset experiment parameter optimization gradient layer "
+    "attention representation benchmark robustness generalization inference latency memory "
+    "distribution sample error loss objective architecture feature transformer retrieval"
+).split()
+
+def read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def bundled_pdf() -> bytes:
+    return read_bytes(BUNDLED_PDF)
+
+def landing_pages() -> dict:
+    """Saved HTML landing pages by name"""
+    pages = {}
+    for filename in sorted(os.listdir(CORPUS_DIR)):
+        if filename.endswith(".html"):
+            with open(os.path.join(CORPUS_DIR, filename), encoding='utf-8') as f:
+                pages[filename[:-len(".html")]] = f.read()
+    return pages
+
+def arxiv_feed() -> bytes:
+    """A saved 50-entry arXiv API response"""
+    return read_bytes(os.path.join(CORPUS_DIR, "arxiv_feed.xml"))
+
+def pdf_text_line(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 14))]
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+def pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(pages: int, seed: int = 0) -> bytes:
+    """
+    A text-only PDF with the given number of pages of pseudo-random prose.
+    Uncompressed content streams and a standard font keep it dependency-free
+    while still exercising the full pdfminer layout path.
+    """
+    rng = random.Random(seed)
+    # Objects 1-3: catalog, page tree, font; then a page and a content stream per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_number in range(pages):
+        lines = [f"Section {page_number + 1}: {pdf_text_line(rng)}"]
+        lines.extend(pdf_text_line(rng) for _ in range(LINES_PER_PAGE - 1))
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td\n" + "\n".join(f"({pdf_escape(line)}) '" for line in lines) + "\nET"
+        stream = stream.encode('latin-1')
+        content_id = len(objects) + 2
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode('latin-1')
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode('latin-1')
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+def pdfs() -> dict:
+    """Every corpus PDF by name: the bundled paper and the synthetic ones"""
+    documents = {"bundled": bundled_pdf()}
+    for name, pages in SYNTHETIC_PDF_PAGES.items():
+        documents[name] = build_pdf(pages, seed=pages)
+    return documents
+
+def paper_text(pages: int = 8) -> str:
+    """Plain text of a synthetic paper, for agents that take extracted text"""
+    rng = random.Random(pages)
+    paragraphs = []
+    for _ in range(pages * 4):
+        paragraphs.append(" ".join(pdf_text_line(rng) for _ in range(10)))
+    return "Abstract: " + "\n\n".join(paragraphs)
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+_server_url = None
+
+def serve_corpus() -> str:
+    """Serve the corpus directory (landing pages) over HTTP on a daemon thread; returns the base URL"""
+    global _server_url
+    if _server_url is None:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=CORPUS_DIR))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        _server_url = f"http://{host}:{port}"
+    return _server_url
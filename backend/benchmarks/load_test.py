@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API (main:app) against local upstream stand-ins
+
+Starts the upstream stand-in (arXiv, Semantic Scholar, DOI, TTS) and a
+server for the saved landing pages, launches the app under uvicorn
+pointed at them, then offers Poisson traffic at each rate in --rates for
+--duration seconds. The traffic is a weighted mix of uploads, URL, DOI,
+search and synthesis requests. Reports p50/p95/p99 latency, throughput and
+error rate per endpoint and rate, and the rate at which each endpoint
+saturates.
+
+    python benchmarks/load_test.py --rates 0.5,1,2,4 --duration 60
+    python benchmarks/load_test.py --target http://127.0.0.1:8000 --mix search=1,doi=1
+
+Arrivals are open-loop: latency is measured from the scheduled arrival
+time, so time spent waiting for a free client slot counts, and a
+saturated server shows up as growing latency instead of a lower offered
+rate. Keep --concurrency above the expected number of in-flight requests.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+import corpus
+
+DEFAULT_MIX = "upload=3,url=2,doi=2,search=2,synthesis=1"
+TOPICS = "Machine Learning,Biology,Physics,Economics"
+QUERIES = ["machine learning", "graph neural networks", "protein folding", "climate models",
+           "reinforcement learning", "speech recognition", "quantum computing", "causal inference"]
+
+_session = threading.local()
+
+def get_session():
+    import requests
+    if not hasattr(_session, 'value'):
+        _session.value = requests.Session()
+    return _session.value
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_until_up(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except urllib.error.HTTPError:
+            # Any HTTP answer means the server is accepting requests
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:.0f}s")
+
+class RequestFactory:
+    """Builds one request per endpoint kind; uniqueness defeats the response cache unless --cache"""
+    def __init__(self, target: str, pages_url: str, use_cache: bool, timeout: float):
+        self.target = target
+        self.timeout = timeout
+        self.pages_url = pages_url
+        self.refresh = "false" if use_cache else "true"
+        self.pdfs = [("bundled.pdf", corpus.bundled_pdf()), ("synthetic_20p.pdf", corpus.build_pdf(20, seed=20))]
+        self.pages = list(corpus.landing_pages())
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def send(self, kind: str, rng: random.Random):
+        session = get_session()
+        request_id = self.next_id()
+        if kind == "upload":
+            filename, contents = rng.choice(self.pdfs)
+            return session.post(f"{self.target}/upload/", files={'file': (filename, contents, 'application/pdf')},
+                                data={'topics': TOPICS, 'refresh': self.refresh}, timeout=self.timeout)
+        if kind == "url":
+            page = rng.choice(self.pages)
+            return session.post(f"{self.target}/process-url/",
+                                params={'url': f"{self.pages_url}/{page}.html?r={request_id}"},
+                                data={'topics': TOPICS, 'refresh': self.refresh}, timeout=self.timeout)
+        if kind == "doi":
+            return session.post(f"{self.target}/process-doi/",
+                                data={'doi': f"10.5555/load.{request_id}", 'topics': TOPICS, 'refresh': self.refresh},
+                                timeout=self.timeout)
+        if kind == "search":
+            return session.post(f"{self.target}/search-papers/",
+                                data={'query': rng.choice(QUERIES), 'source': 'all', 'max_results': 10},
+                                timeout=self.timeout)
+        if kind == "synthesis":
+            # IDs in the range the stand-in synthesizes arXiv entries for
+            start = rng.randint(0, 50)
+            paper_ids = ",".join(f"2301.{i:05d}v1" for i in range(start, start + 3))
+            return session.post(f"{self.target}/synthesize-papers/",
+                                data={'paper_ids': paper_ids, 'query': rng.choice(QUERIES)}, timeout=self.timeout)
+        raise ValueError(f"Unknown request kind {kind}")
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in ("upload", "url", "doi", "search", "synthesis"):
+            raise SystemExit(f"Unknown endpoint '{kind}' in --mix")
+        weights[kind.strip()] = float(weight or 1)
+    return weights
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+def summarize(samples: list, window: float) -> dict:
+    """
+    Latency and throughput of the requests that arrived in the offered window.
+    Rates are per second of that window, so the drain of slow requests after
+    it does not count against throughput.
+    """
+    latencies = sorted(sample['latency'] for sample in samples)
+    errors = sum(1 for sample in samples if not sample['ok'])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'offered_per_second': len(samples) / window if window else 0.0,
+        'throughput_per_second': (len(samples) - errors) / window if window else 0.0,
+        'p50_seconds': percentile(latencies, 0.50),
+        'p95_seconds': percentile(latencies, 0.95),
+        'p99_seconds': percentile(latencies, 0.99),
+        'max_seconds': latencies[-1] if latencies else 0.0,
+        'mean_wait_seconds': sum(sample['wait'] for sample in samples) / len(samples) if samples else 0.0
+    }
+
+def run_stage(factory: RequestFactory, rate: float, duration: float, weights: dict,
+              concurrency: int, rng: random.Random) -> dict:
+    """Offer Poisson arrivals at rate for duration seconds and collect per-request samples"""
+    kinds = list(weights)
+    kind_weights = [weights[kind] for kind in kinds]
+    samples = []
+    samples_lock = threading.Lock()
+
+    def issue(kind: str, scheduled: float, seed: int):
+        started = time.monotonic()
+        ok = False
+        status = None
+        try:
+            response = factory.send(kind, random.Random(seed))
+            status = response.status_code
+            ok = status < 400
+            # Drain streamed bodies so the latency covers the whole response
+            response.content
+        except Exception as e:
+            status = type(e).__name__
+        finished = time.monotonic()
+        with samples_lock:
+            samples.append({'kind': kind, 'ok': ok, 'status': status,
+                            'latency': finished - scheduled, 'wait': started - scheduled})
+
+    stage_start = time.monotonic()
+    arrival = stage_start
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as executor:
+        while True:
+            arrival += rng.expovariate(rate)
+            if arrival - stage_start >= duration:
+                break
+            delay = arrival - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            kind = rng.choices(kinds, kind_weights)[0]
+            executor.submit(issue, kind, arrival, rng.random())
+    # Leaving the executor waited for the in-flight requests to drain
+    elapsed = time.monotonic() - stage_start
+    window = duration
+
+    by_kind = {kind: summarize([s for s in samples if s['kind'] == kind], window) for kind in kinds}
+    return {
+        'offered_rate': rate,
+        'duration_seconds': window,
+        'elapsed_seconds': elapsed,
+        'overall': summarize(samples, window),
+        'endpoints': by_kind
+    }
+
+def is_saturated(stats: dict, args) -> bool:
+    """
+    Whether an endpoint breached the SLO, the error budget or 90% of the
+    arrivals actually issued (not the nominal rate, which Poisson noise
+    misses at low weights). Too few samples are never judged.
+    """
+    if stats['requests'] < args.min_requests:
+        return False
+    if stats['error_rate'] > args.max_error_rate or stats['p95_seconds'] > args.slo:
+        return True
+    return stats['throughput_per_second'] < stats['offered_per_second'] * 0.9
+
+def print_stage(stage: dict):
+    print(f"\nOffered {stage['offered_rate']:g} req/s for {stage['duration_seconds']:.0f}s")
+    print(f"  {'endpoint':<10} {'requests':>8} {'error%':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'wait':>7}")
+    rows = list(stage['endpoints'].items()) + [('all', stage['overall'])]
+    for kind, stats in rows:
+        print(f"  {kind:<10} {stats['requests']:>8} {stats['error_rate']:>6.1%} {stats['throughput_per_second']:>7.2f} "
+              f"{stats['p50_seconds']:>7.2f}s {stats['p95_seconds']:>7.2f}s {stats['p99_seconds']:>7.2f}s "
+              f"{stats['mean_wait_seconds']:>6.2f}s")
+
+def start_dependencies(args) -> tuple:
+    """Start the stand-in and (unless --target) the app; returns (target URL, pages URL, processes)"""
+    processes = []
+    standin_port = free_port()
+    standin_command = [sys.executable, os.path.join(BACKEND_DIR, "upstream_standin.py"), "--mode", "replay",
+                       "--port", str(standin_port), "--quiet",
+                       "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", str(args.upstream_jitter_ms),
+                       "--error-rate", str(args.upstream_error_rate)]
+    processes.append(subprocess.Popen(standin_command, cwd=BACKEND_DIR))
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    pages_url = corpus.serve_corpus()
+
+    target = args.target.rstrip("/")
+    if not target:
+        app_port = free_port()
+        env = dict(os.environ, UPSTREAM_STANDIN_URL=standin_url)
+        env.setdefault("LOG_LEVEL", "WARNING")
+        app_command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                       "--port", str(app_port), "--no-access-log"]
+        processes.append(subprocess.Popen(app_command, cwd=BACKEND_DIR, env=env))
+        target = f"http://127.0.0.1:{app_port}"
+        # The stand-in must be up before the app's first upstream call
+        wait_until_up(f"{standin_url}/", args.startup_timeout)
+        wait_until_up(f"{target}/health", args.startup_timeout)
+    else:
+        print(f"Using the app at {target}; start it with UPSTREAM_STANDIN_URL={standin_url} to use the stand-in")
+        wait_until_up(f"{standin_url}/", args.startup_timeout)
+    return target, pages_url, processes
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with a mixed workload against local stand-ins")
+    parser.add_argument("--rates", default="0.5,1,2,4", help="comma-separated offered rates in requests/second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per rate")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight from the client")
+    parser.add_argument("--timeout", type=float, default=300, help="per-request timeout in seconds")
+    parser.add_argument("--slo", type=float, default=10.0, help="p95 latency in seconds above which an endpoint is saturated")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="error rate above which an endpoint is saturated")
+    parser.add_argument("--min-requests", type=int, default=20,
+                        help="fewest requests to an endpoint at one rate before it can be judged saturated")
+    parser.add_argument("--cache", action="store_true", help="let the response cache answer repeated requests")
+    parser.add_argument("--target", default="", help="load an already running app instead of starting one")
+    parser.add_argument("--upstream-latency-ms", type=float, default=100)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50)
+    parser.add_argument("--upstream-error-rate", type=float, default=0)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rates.split(",") if rate.strip()]
+    weights = parse_mix(args.mix)
+    target, pages_url, processes = start_dependencies(args)
+    factory = RequestFactory(target, pages_url, args.cache, args.timeout)
+    rng = random.Random(args.seed)
+
+    print(f"Load test of {target}: mix {args.mix}, concurrency {args.concurrency}, p95 SLO {args.slo:g}s")
+    print("=" * 78)
+    stages = []
+    saturation = {}
+    judged = set()
+    try:
+        for rate in rates:
+            stage = run_stage(factory, rate, args.duration, weights, args.concurrency, rng)
+            stages.append(stage)
+            print_stage(stage)
+            for kind, stats in list(stage['endpoints'].items()) + [('all', stage['overall'])]:
+                if stats['requests'] >= args.min_requests:
+                    judged.add(kind)
+                if kind not in saturation and is_saturated(stats, args):
+                    saturation[kind] = rate
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+    print("\nSaturation (first offered rate breaching the p95 SLO, error budget or 90% of issued requests):")
+    for kind in list(weights) + ['all']:
+        rate = saturation.get(kind)
+        if rate is not None:
+            verdict = f"{rate:g} req/s"
+        elif kind in judged:
+            verdict = f"not reached up to {rates[-1]:g} req/s"
+        else:
+            verdict = f"too few requests (under {args.min_requests} per rate) to judge; raise --duration"
+        print(f"  {kind:<10} {verdict}")
+
+    if args.output:
+        report = {
+            'created_at': datetime.now().isoformat(),
+            'target': target,
+            'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+            'stages': stages,
+            'saturation_rate': saturation
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
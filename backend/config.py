@@ -15,4 +15,227 @@ class Config:
     @classmethod
     def is_offline_mode(cls) -> bool:
         """Check if running in offline mode (no internet for model downloads)"""
-        return os.getenv("OFFLINE_MODE", "false").lower() == "true" 
\ No newline at end of file
+        return os.getenv("OFFLINE_MODE", "false").lower() == "true"
+    
+    @classmethod
+    def get_max_fetch_bytes(cls) -> int:
+        """Get the maximum size of a fetched paper body in bytes"""
+        return int(os.getenv("MAX_FETCH_BYTES", str(50 * 1024 * 1024)))
+    
+    @classmethod
+    def get_fetch_timeout(cls) -> float:
+        """Get the timeout in seconds for fetching papers from remote hosts"""
+        return float(os.getenv("FETCH_TIMEOUT", "30"))
+    
+    @classmethod
+    def get_upstream_standin_url(cls) -> str:
+        """Get the base URL of the local upstream stand-in (empty to use the real services)"""
+        return os.getenv("UPSTREAM_STANDIN_URL", "").rstrip("/")
+    
+    @classmethod
+    def get_upstream_url(cls, service: str, default: str) -> str:
+        """Resolve an upstream base URL: explicit override, then the stand-in, then the real service"""
+        override = os.getenv(f"{service.upper()}_URL")
+        if override:
+            return override.rstrip("/")
+        standin = cls.get_upstream_standin_url()
+        if standin:
+            return f"{standin}/{service.lower()}"
+        return default
+    
+    @classmethod
+    def get_doi_resolver_url(cls) -> str:
+        """Get the base URL of the DOI resolver used for metadata content negotiation"""
+        return cls.get_upstream_url("DOI_RESOLVER", "https://doi.org")
+    
+    @classmethod
+    def get_arxiv_api_url(cls) -> str:
+        """Get the arXiv API query endpoint"""
+        return cls.get_upstream_url("ARXIV_API", "http://export.arxiv.org/api/query")
+    
+    @classmethod
+    def get_semantic_scholar_api_url(cls) -> str:
+        """Get the Semantic Scholar Graph API base URL"""
+        return cls.get_upstream_url("SEMANTIC_SCHOLAR_API", "https://api.semanticscholar.org/graph/v1")
+    
+    @classmethod
+    def get_tts_service_url(cls) -> str:
+        """Get the URL of a TTS stand-in service (empty to call gTTS directly)"""
+        return cls.get_upstream_url("TTS_SERVICE", "")
+    
+    @classmethod
+    def get_paper_store_size(cls) -> int:
+        """Get the maximum number of papers kept in the server-side paper store"""
+        return int(os.getenv("PAPER_STORE_SIZE", "5000"))
+    
+    @classmethod
+    def get_audio_workers(cls) -> int:
+        """Get the number of background threads that run TTS jobs"""
+        return int(os.getenv("AUDIO_WORKERS", "2"))
+    
+    @classmethod
+    def get_audio_queue_size(cls) -> int:
+        """Get the maximum number of audio jobs waiting or running at once"""
+        return int(os.getenv("AUDIO_QUEUE_SIZE", "100"))
+    
+    @classmethod
+    def get_audio_job_retention(cls) -> int:
+        """Get how many audio jobs are kept for status polling"""
+        return int(os.getenv("AUDIO_JOB_RETENTION", "1000"))
+    
+    @classmethod
+    def get_narration_store_size(cls) -> int:
+        """Get how many narration texts are kept for on-demand audio synthesis"""
+        return int(os.getenv("NARRATION_STORE_SIZE", "5000"))
+    
+    @classmethod
+    def get_io_workers(cls) -> int:
+        """Get the size of the thread pool for network and disk I/O"""
+        return int(os.getenv("IO_WORKERS", "16"))
+    
+    @classmethod
+    def get_cpu_workers(cls) -> int:
+        """Get the number of parser processes (0 parses on the I/O threads instead)"""
+        return int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 1)))
+    
+    @classmethod
+    def get_model_workers(cls) -> int:
+        """Get how many model inferences (e.g. BART summaries) may run at once"""
+        return int(os.getenv("MODEL_WORKERS", "1"))
+    
+    @classmethod
+    def get_job_queue_path(cls) -> str:
+        """Get the SQLite file backing the durable processing job queue"""
+        return os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+    
+    @classmethod
+    def get_job_workers(cls) -> int:
+        """Get how many worker processes drain the job queue"""
+        return int(os.getenv("JOB_WORKERS", "2"))
+    
+    @classmethod
+    def get_job_max_attempts(cls) -> int:
+        """Get how many times a failing job is attempted before it is marked failed"""
+        return int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    
+    @classmethod
+    def get_job_lease_seconds(cls) -> int:
+        """Get how long a worker owns a job before it is considered crashed and the job is retried"""
+        return int(os.getenv("JOB_LEASE_SECONDS", "900"))
+    
+    @classmethod
+    def get_job_result_ttl(cls) -> int:
+        """Get how long finished job results are kept for polling, in seconds"""
+        return int(os.getenv("JOB_RESULT_TTL", "86400"))
+    
+    @classmethod
+    def get_job_poll_interval(cls) -> float:
+        """Get how often idle workers check the queue, in seconds"""
+        return float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    
+    @classmethod
+    def get_stage_timeout(cls, stage: str) -> float:
+        """Get the timeout for a pipeline stage: STAGE_TIMEOUT_<STAGE>, else STAGE_TIMEOUT (seconds)"""
+        default = os.getenv("STAGE_TIMEOUT", "300")
+        return float(os.getenv(f"STAGE_TIMEOUT_{stage.upper()}", default))
+    
+    @classmethod
+    def get_stage_cache_size(cls) -> int:
+        """Get how many cached stage results (e.g. summaries) are kept"""
+        return int(os.getenv("STAGE_CACHE_SIZE", "1000"))
+    
+    @classmethod
+    def get_batch_max_items(cls) -> int:
+        """Get the most DOIs, URLs and PDFs accepted by one /process-batch/ call"""
+        return int(os.getenv("BATCH_MAX_ITEMS", "200"))
+    
+    @classmethod
+    def get_batch_concurrency(cls) -> int:
+        """Get how many batch items are in flight at once"""
+        return int(os.getenv("BATCH_CONCURRENCY", "8"))
+    
+    @classmethod
+    def get_summary_batch_size(cls) -> int:
+        """Get the most texts summarized in one batched model call"""
+        return int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+    
+    @classmethod
+    def get_summary_batch_wait(cls) -> float:
+        """Get how long a summary request waits for others to share its model call, in seconds"""
+        return float(os.getenv("SUMMARY_BATCH_WAIT_MS", "50")) / 1000
+    
+    @classmethod
+    def get_response_cache_ttl(cls) -> int:
+        """Get how long processed-paper responses are reused, in seconds (0 disables the cache)"""
+        return int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    
+    @classmethod
+    def get_response_cache_size(cls) -> int:
+        """Get how many processed-paper responses are cached"""
+        return int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+    
+    @classmethod
+    def get_admin_token(cls) -> str:
+        """Get the token required in X-Admin-Token for admin endpoints (empty disables them)"""
+        return os.getenv("ADMIN_TOKEN", "")
+    
+    @classmethod
+    def get_profile_dir(cls) -> str:
+        """Get the directory where per-request profiles are written"""
+        return os.getenv("PROFILE_DIR", "profiles")
+    
+    @classmethod
+    def get_profile_interval(cls) -> float:
+        """Get the stack sampling interval for profiled requests, in seconds (PROFILE_INTERVAL_MS)"""
+        return float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+    
+    @classmethod
+    def get_agent_warmup(cls) -> str:
+        """Get what to load in the background at startup: off (load agents on first use), imports, or models"""
+        return os.getenv("AGENT_WARMUP", "off").lower()
+    
+    @classmethod
+    def get_log_level(cls) -> str:
+        """Get the minimum log level (DEBUG, INFO, WARNING, ERROR)"""
+        return os.getenv("LOG_LEVEL", "INFO").upper()
+    
+    @classmethod
+    def get_log_format(cls) -> str:
+        """Get the log output format: json (one object per line) or text"""
+        return os.getenv("LOG_FORMAT", "json").lower()
+    
+    @classmethod
+    def get_tts_chunk_chars(cls) -> int:
+        """Get the maximum characters per TTS request when narration is split into chunks"""
+        return int(os.getenv("TTS_CHUNK_CHARS", "600"))
+    
+    @classmethod
+    def get_tts_parallelism(cls) -> int:
+        """Get the maximum number of TTS chunk requests in flight at once"""
+        return int(os.getenv("TTS_PARALLELISM", "4"))
+    
+    @classmethod
+    def get_tts_chunk_retries(cls) -> int:
+        """Get how many times a failed TTS chunk is retried"""
+        return int(os.getenv("TTS_CHUNK_RETRIES", "2"))
+    
+    @classmethod
+    def get_tts_engine_names(cls) -> list:
+        """Get the TTS engines to try, in failover order (gtts, espeak, tts_service)"""
+        default = "tts_service" if cls.get_tts_service_url() else "gtts,espeak"
+        return [name.strip() for name in os.getenv("TTS_ENGINES", default).split(",") if name.strip()]
+    
+    @classmethod
+    def get_storage_quota_bytes(cls) -> int:
+        """Get the maximum total size of generated audio and uploaded PDFs in data/"""
+        return int(os.getenv("STORAGE_QUOTA_BYTES", str(1024 * 1024 * 1024)))
+    
+    @classmethod
+    def get_storage_ttl_seconds(cls) -> int:
+        """Get how long a stored file may go unused before it is evicted"""
+        return int(os.getenv("STORAGE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
+    @classmethod
+    def get_storage_evict_interval(cls) -> float:
+        """Get how often, in seconds, expired and over-quota files are evicted in the background"""
+        return float(os.getenv("STORAGE_EVICT_INTERVAL", "3600"))
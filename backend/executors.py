@@ -0,0 +1,114 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Separately sized pools so slow stages cannot starve each other:
+# I/O threads for network and disk, processes for CPU-bound parsing (pdfminer
+# holds the GIL) and model threads for inference (torch releases the GIL, and
+# the model is loaded once per process, so it stays in the web process).
+_io_executor = None
+_cpu_executor = None
+_model_executor = None
+# Calls submitted and not yet finished, per executor, for pool utilization.
+# Only touched from the event loop in run_in.
+_busy = {}
+_lock = threading.Lock()
+
+def get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=Config.get_io_workers(), thread_name_prefix="io")
+        return _io_executor
+
+def get_cpu_executor() -> Executor:
+    """Process pool for parsing, or the I/O pool when CPU_WORKERS is 0"""
+    global _cpu_executor
+    if Config.get_cpu_workers() <= 0:
+        return get_io_executor()
+    with _lock:
+        if _cpu_executor is None:
+            # spawn, not fork: the web process may already hold torch and client threads
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=Config.get_cpu_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _cpu_executor
+
+def get_model_executor() -> ThreadPoolExecutor:
+    global _model_executor
+    with _lock:
+        if _model_executor is None:
+            _model_executor = ThreadPoolExecutor(max_workers=Config.get_model_workers(), thread_name_prefix="model")
+        return _model_executor
+
+async def run_in(executor: Executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    if isinstance(executor, ThreadPoolExecutor):
+        # Carry the request/job IDs into the thread for its log lines
+        call = functools.partial(contextvars.copy_context().run, call)
+    _busy[executor] = _busy.get(executor, 0) + 1
+    try:
+        return await loop.run_in_executor(executor, call)
+    finally:
+        _busy[executor] -= 1
+        if not _busy[executor]:
+            del _busy[executor]
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking network or disk call without blocking the event loop"""
+    return await run_in(get_io_executor(), func, *args, **kwargs)
+
+async def run_cpu(func, *args, **kwargs):
+    """
+    Run CPU-bound work in a parser process. func and its arguments must be
+    picklable, i.e. module-level functions in agents/ with plain data.
+    """
+    global _cpu_executor
+    try:
+        return await run_in(get_cpu_executor(), func, *args, **kwargs)
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory on a huge PDF); start a fresh pool
+        # next time and finish this call on a thread
+        logger.warning("Parser process pool is broken, running %s on an I/O thread", func.__name__)
+        with _lock:
+            _cpu_executor = None
+        return await run_io(func, *args, **kwargs)
+
+async def run_model(func, *args, **kwargs):
+    """Run model inference on the bounded model pool"""
+    return await run_in(get_model_executor(), func, *args, **kwargs)
+
+def pool_stats() -> dict:
+    """Workers, busy workers and calls waiting for a worker, per started pool"""
+    with _lock:
+        pools = [('io', _io_executor, Config.get_io_workers()),
+                 ('cpu', _cpu_executor, Config.get_cpu_workers()),
+                 ('model', _model_executor, Config.get_model_workers())]
+    stats = {}
+    for name, executor, workers in pools:
+        if executor is None:
+            continue
+        submitted = _busy.get(executor, 0)
+        stats[name] = {'workers': workers, 'busy': min(submitted, workers), 'queued': max(submitted - workers, 0)}
+    return stats
+
+def shutdown():
+    """Stop all pools; pending work is cancelled"""
+    global _io_executor, _cpu_executor, _model_executor
+    with _lock:
+        executors = [_io_executor, _cpu_executor, _model_executor]
+        _io_executor = _cpu_executor = _model_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
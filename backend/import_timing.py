@@ -0,0 +1,103 @@
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+# Install before the imports to be measured: main.py does so on its first line
+_records = []
+_records_lock = threading.Lock()
+_local = threading.local()
+_installed_at = None
+_startup_count = None
+_startup_seconds = None
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Times the execution of every module imported after install(), like
+    python -X importtime but readable from inside the app. Finding is left to
+    the other finders; only the loader's exec_module of the found spec is
+    wrapped, so self time excludes the nested imports a module triggers.
+    """
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                wrap_loader(spec)
+                return spec
+        return None
+
+def wrap_loader(spec):
+    loader = spec.loader
+    # Built-in and frozen importers are shared classes rather than per-module loaders
+    if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+        return
+    # Some loader instances serve many modules (a zipimporter per archive),
+    # so each is wrapped once and records the module it is executing
+    if getattr(loader, '_import_timing_wrapped', False):
+        return
+    exec_module = loader.exec_module
+    def timed_exec_module(module):
+        name = module.__name__
+        stack = _local.__dict__.setdefault('stack', [])
+        frame = [0.0]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with _records_lock:
+                _records.append({
+                    'module': name,
+                    'self_seconds': elapsed - frame[0],
+                    'cumulative_seconds': elapsed,
+                    'nested': len(stack) > 0,
+                    'thread': threading.current_thread().name,
+                    'at_seconds': started - _installed_at
+                })
+    try:
+        loader.exec_module = timed_exec_module
+        loader._import_timing_wrapped = True
+    except AttributeError:
+        pass
+
+def install():
+    """Start timing imports; idempotent"""
+    global _installed_at
+    if _installed_at is None:
+        _installed_at = time.perf_counter()
+        sys.meta_path.insert(0, ImportTimer())
+
+def mark_startup():
+    """Record that startup is complete; later imports are reported as lazy loads"""
+    global _startup_count, _startup_seconds
+    with _records_lock:
+        _startup_count = len(_records)
+    _startup_seconds = time.perf_counter() - _installed_at if _installed_at is not None else 0.0
+
+def summarize(records: List[dict], limit: int) -> Dict[str, Any]:
+    # Top-level imports hold their nested ones, so their sum is the wall time spent importing
+    return {
+        'modules': len(records),
+        'import_seconds': sum(record['cumulative_seconds'] for record in records if not record['nested']),
+        'slowest_cumulative': sorted(records, key=lambda record: record['cumulative_seconds'], reverse=True)[:limit],
+        'slowest_self': sorted(records, key=lambda record: record['self_seconds'], reverse=True)[:limit]
+    }
+
+def report(limit: int = 20) -> Dict[str, Any]:
+    """Import times split into startup and the imports that came after it"""
+    with _records_lock:
+        records = list(_records)
+    split = _startup_count if _startup_count is not None else len(records)
+    return {
+        'installed': _installed_at is not None,
+        'startup_seconds': _startup_seconds,
+        'startup': summarize(records[:split], limit),
+        'after_startup': summarize(records[split:], limit)
+    }
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Durable queue for processing jobs, shared by the web process (enqueue and
+# poll) and worker processes (claim and finish) through one SQLite file.
+# status: 'queued' -> 'running' -> 'succeeded' | 'failed' (or back to
+# 'queued' with a delay when an attempt fails and retries remain)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    result TEXT,
+    artifacts TEXT,
+    error TEXT NOT NULL DEFAULT '',
+    worker TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_expires_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at);
+"""
+
+# Base delay before a failed attempt is retried; doubles with each attempt
+RETRY_DELAY = 5
+
+_local = threading.local()
+
+def get_connection() -> sqlite3.Connection:
+    """One connection per thread (and process), created on first use"""
+    connection = getattr(_local, 'connection', None)
+    path = Config.get_job_queue_path()
+    if connection is None or getattr(_local, 'path', None) != path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        # WAL lets pollers read while a worker writes
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        _local.connection = connection
+        _local.path = path
+    return connection
+
+def close_connection():
+    """Close this thread's connection, e.g. before a short-lived thread exits"""
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+
+def enqueue(kind: str, payload: Dict[str, Any]) -> str:
+    """Add a job and return its ID"""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    connection = get_connection()
+    connection.execute(
+        "INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at, available_at) "
+        "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+        (job_id, kind, json.dumps(payload), Config.get_job_max_attempts(), now, now, now)
+    )
+    purge_expired()
+    return job_id
+
+def claim(worker: str) -> Optional[Dict[str, Any]]:
+    """
+    Take the oldest runnable job for a worker, or None. Jobs whose worker
+    died mid-run (lease expired) are claimed again as a new attempt.
+    """
+    now = time.time()
+    connection = get_connection()
+    # IMMEDIATE takes the write lock up front so two workers never claim the same job
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        while True:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_expires_at < ?) "
+                "ORDER BY available_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            if row['status'] == 'queued' or row['attempts'] < row['max_attempts']:
+                break
+            # The job keeps taking its worker down; stop retrying it
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, lease_expires_at = NULL, "
+                "expires_at = ? WHERE id = ?",
+                ("Worker stopped while running the job", now, now + Config.get_job_result_ttl(), row['id'])
+            )
+        connection.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+            "updated_at = ?, lease_expires_at = ? WHERE id = ?",
+            (worker, now, now + Config.get_job_lease_seconds(), row['id'])
+        )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    job = row_to_job(row)
+    job['attempts'] += 1
+    job['status'] = 'running'
+    return job
+
+def renew_lease(job_id: str, worker: str) -> bool:
+    """
+    Extend a running job's lease by JOB_LEASE_SECONDS. Workers call this
+    periodically so long jobs are not reclaimed while still running; False
+    means the job is no longer this worker's.
+    """
+    now = time.time()
+    cursor = get_connection().execute(
+        "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+        (now + Config.get_job_lease_seconds(), now, job_id, worker)
+    )
+    return cursor.rowcount == 1
+
+def complete(job_id: str, result: Dict[str, Any], artifacts: Optional[Dict[str, Any]] = None):
+    finish(job_id, 'succeeded', result, artifacts, '')
+
+def fail(job_id: str, error: str, result: Optional[Dict[str, Any]] = None, retry: bool = True):
+    """Record a failed attempt; the job is queued again with backoff while attempts remain"""
+    job = get_job(job_id)
+    if job is None:
+        return
+    if retry and job['attempts'] < job['max_attempts']:
+        delay = RETRY_DELAY * (2 ** (job['attempts'] - 1))
+        now = time.time()
+        get_connection().execute(
+            "UPDATE jobs SET status = 'queued', error = ?, updated_at = ?, available_at = ?, "
+            "lease_expires_at = NULL WHERE id = ?",
+            (error, now, now + delay, job_id)
+        )
+        logger.warning("Job %s attempt %s failed, retrying in %ss: %s", job_id, job['attempts'], delay, error)
+        return
+    finish(job_id, 'failed', result, None, error)
+
+def finish(job_id: str, status: str, result, artifacts, error: str):
+    now = time.time()
+    get_connection().execute(
+        "UPDATE jobs SET status = ?, result = ?, artifacts = ?, error = ?, updated_at = ?, "
+        "lease_expires_at = NULL, expires_at = ? WHERE id = ?",
+        (status, json.dumps(result) if result is not None else None,
+         json.dumps(artifacts) if artifacts is not None else None,
+         error, now, now + Config.get_job_result_ttl(), job_id)
+    )
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """A job's state and, once finished, its result; None if unknown or expired"""
+    row = get_connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    if row['expires_at'] is not None and row['expires_at'] < time.time():
+        return None
+    return row_to_job(row)
+
+def row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        'job_id': row['id'],
+        'kind': row['kind'],
+        'payload': json.loads(row['payload']),
+        'status': row['status'],
+        'attempts': row['attempts'],
+        'max_attempts': row['max_attempts'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'artifacts': json.loads(row['artifacts']) if row['artifacts'] else None,
+        'error': row['error'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at']
+    }
+
+def purge_expired() -> int:
+    """Delete finished jobs whose results outlived JOB_RESULT_TTL"""
+    cursor = get_connection().execute(
+        "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+    )
+    return cursor.rowcount
+
+def queue_depth() -> int:
+    # Scraped by /metrics; do not create the database when async mode is unused
+    if not os.path.exists(Config.get_job_queue_path()):
+        return 0
+    row = get_connection().execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()
+    return row[0]
@@ -0,0 +1,89 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+
+# Correlation IDs for the current request or job. Context variables follow
+# the request across awaits and into executor threads (see executors.run_in).
+request_id_var = contextvars.ContextVar("request_id", default="")
+job_id_var = contextvars.ContextVar("job_id", default="")
+
+_listener = None
+_lock = threading.Lock()
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread. Only the correlation IDs are
+    captured on the calling thread; message formatting and writing happen
+    on the listener, so a log call costs a queue put.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        record.job_id = job_id_var.get()
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference live frames; render them before they change
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        if getattr(record, 'request_id', ''):
+            entry['request_id'] = record.request_id
+        if getattr(record, 'job_id', ''):
+            entry['job_id'] = record.job_id
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(context)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        ids = [f"{name}={getattr(record, name)}" for name in ('request_id', 'job_id') if getattr(record, name, '')]
+        record.context = f" [{' '.join(ids)}]" if ids else ""
+        return super().format(record)
+
+def setup_logging():
+    """Route all logging through a queue to one stdout writer thread; safe to call repeatedly"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter() if Config.get_log_format() == "json" else TextFormatter())
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(ContextQueueHandler(log_queue))
+        root.setLevel(Config.get_log_level())
+        # Keep per-request chatter from libraries out unless we are debugging
+        for name in ("urllib3", "pdfminer", "transformers", "multipart"):
+            logging.getLogger(name).setLevel(max(root.level, logging.WARNING))
+        atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -1,18 +1,43 @@
 # backend/main.py
-from fastapi import FastAPI, UploadFile, Form, HTTPException
+# First, so the import-time report covers everything below
+import import_timing
+import_timing.install()
+
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import agents
 from agents import (
     search_agent, parser_agent,
     classifier_agent, summarizer_agent,
-    synthesizer_agent, audio_agent
+    synthesizer_agent
 )
+import paper_store
+import audio_jobs
+import storage
+import executors
+import job_queue
+import response_cache
+import logging_config
+import metrics
+import profiling
+from pipeline import Pipeline, Stage, StageCache
+from batching import MicroBatcher
+from config import Config
 import uuid
-import traceback
+import base64
+import hmac
+import json
 import os
+import logging
 from datetime import datetime
 import re
+import asyncio
+from typing import List
+
+logging_config.setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Research Summarization API", version="1.0.0")
 origins = [
@@ -28,12 +53,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Abstracts at least this long are summarized without fetching the paper
+MIN_ABSTRACT_LENGTH = 300
+
 # Create data directory if it doesn't exist and mount static files
 data_dir = "data"
 if not os.path.exists(data_dir):
     os.makedirs(data_dir)
 app.mount("/data", StaticFiles(directory=data_dir), name="data")
 
+@app.on_event("startup")
+async def load_storage_inventory():
+    await executors.run_io(storage.load_inventory)
+    # Writes evict too, but expired files must also go while nothing is written
+    app.state.evict_task = asyncio.ensure_future(evict_storage_periodically())
+
+async def evict_storage_periodically():
+    while True:
+        await asyncio.sleep(Config.get_storage_evict_interval())
+        try:
+            await executors.run_io(storage.evict)
+        except Exception as e:
+            logger.error("Periodic storage eviction failed: %s", e)
+
+@app.on_event("startup")
+async def report_startup_imports():
+    """Log how long startup imports took and start the optional agent warmup"""
+    import_timing.mark_startup()
+    startup = import_timing.report(limit=5)['startup']
+    logger.info("Startup imported %s modules in %.0f ms; slowest: %s",
+                startup['modules'], startup['import_seconds'] * 1000,
+                ", ".join(f"{record['module']} ({record['cumulative_seconds'] * 1000:.0f} ms)"
+                          for record in startup['slowest_cumulative']))
+    warmup = Config.get_agent_warmup()
+    if warmup in agents.WARMUP_MODES and warmup != "off":
+        agents.warm_up_in_background(warmup)
+    elif warmup != "off":
+        logger.warning("Unknown AGENT_WARMUP %r, expected one of %s", warmup, ", ".join(agents.WARMUP_MODES))
+
+@app.on_event("shutdown")
+async def stop_storage_eviction():
+    app.state.evict_task.cancel()
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    executors.shutdown()
+
+@app.middleware("http")
+async def track_data_access(request, call_next):
+    """Refresh the LRU position of files served from /data so eviction keeps hot ones"""
+    if request.method == "GET" and request.url.path.startswith("/data/"):
+        storage.touch(os.path.normpath(request.url.path[len("/data/"):]))
+    return await call_next(request)
+
+@app.middleware("http")
+async def tag_request_id(request, call_next):
+    """
+    Tag log lines with the caller's X-Request-ID (or a new one) and echo it
+    back. Admins can profile a request with X-Profile: 1 or ?profile=1.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = logging_config.request_id_var.set(request_id)
+    try:
+        if request.headers.get("x-profile") in PROFILE_FLAGS or request.query_params.get("profile") in PROFILE_FLAGS:
+            response = await call_profiled(request, call_next)
+        else:
+            response = await call_next(request)
+    finally:
+        logging_config.request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+PROFILE_FLAGS = ("1", "true")
+
+async def call_profiled(request, call_next):
+    """
+    Run one request under the sampling profiler and tracemalloc (see
+    profiling.py). The profile covers the streamed body too and its ID is
+    returned in X-Profile-ID; fetch it from /profiles/{profile_id}.
+    """
+    if not is_admin(request):
+        return JSONResponse(status_code=403, content={"detail": "Admin token required"})
+    session = profiling.start_session(f"{request.method} {request.url.path}")
+    if session is None:
+        return JSONResponse(status_code=409, content={"detail": "Another request is being profiled"})
+    try:
+        response = await call_next(request)
+    except BaseException:
+        end_profile(session)
+        raise
+    response.body_iterator = finish_profile_after(response.body_iterator, session)
+    response.headers["X-Profile-ID"] = session.profile_id
+    return response
+
+async def finish_profile_after(body_iterator, session):
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        end_profile(session)
+
+def end_profile(session):
+    """
+    Stop sampling without awaiting, so a client disconnect cannot cancel it,
+    then snapshot memory, stop tracemalloc and write the files on an I/O
+    thread, which also lets the next profile start
+    """
+    session.stop()
+    try:
+        executors.get_io_executor().submit(session.write)
+    except RuntimeError:
+        # The pool is shutting down; write here so tracing is still stopped
+        session.write()
+
 def extract_metadata_from_content(content: str, url: str = "") -> dict:
     """Extract metadata from paper content"""
     metadata = {
@@ -83,9 +215,9 @@ def extract_metadata_from_content(content: str, url: str = "") -> dict:
         authors = extract_authors_enhanced(content)
         if authors:
             metadata['authors'] = authors
-            print(f"Extracted authors: {authors}")
+            logger.debug("Extracted authors: %s", authors)
         else:
-            print("No authors extracted, using default")
+            logger.debug("No authors extracted, using default")
         
         # Try to extract journal name
         journal_patterns = [
@@ -105,7 +237,7 @@ def extract_metadata_from_content(content: str, url: str = "") -> dict:
                     break
                     
     except Exception as e:
-        print(f"Error extracting metadata: {e}")
+        logger.error("Error extracting metadata: %s", e)
     
     return metadata
 
@@ -114,7 +246,7 @@ def extract_authors_enhanced(content: str) -> list:
     authors = []
     
     try:
-        print("Starting enhanced author extraction...")
+        logger.debug("Starting enhanced author extraction...")
         
         # Strategy 1: JSON-LD structured data
         json_ld_pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
@@ -142,7 +274,7 @@ def extract_authors_enhanced(content: str) -> list:
                 continue
         
         if authors:
-            print(f"Strategy 1 (JSON-LD) found authors: {authors}")
+            logger.debug("Strategy 1 (JSON-LD) found authors: %s", authors)
         
         # Strategy 2: Meta tags
         meta_author_patterns = [
@@ -161,7 +293,7 @@ def extract_authors_enhanced(content: str) -> list:
         
         if meta_authors:
             authors.extend(meta_authors)
-            print(f"Strategy 2 (Meta tags) found authors: {meta_authors}")
+            logger.debug("Strategy 2 (Meta tags) found authors: %s", meta_authors)
         
         # Strategy 3: JSON patterns in content
         json_author_patterns = [
@@ -188,7 +320,7 @@ def extract_authors_enhanced(content: str) -> list:
         
         if json_authors:
             authors.extend(json_authors)
-            print(f"Strategy 3 (JSON patterns) found authors: {json_authors}")
+            logger.debug("Strategy 3 (JSON patterns) found authors: %s", json_authors)
         
         # Strategy 4: Text-based patterns
         text_author_patterns = [
@@ -215,7 +347,7 @@ def extract_authors_enhanced(content: str) -> list:
         
         if text_authors:
             authors.extend(text_authors)
-            print(f"Strategy 4 (Text patterns) found authors: {text_authors}")
+            logger.debug("Strategy 4 (Text patterns) found authors: %s", text_authors)
         
         # Strategy 5: HTML structure patterns
         html_author_patterns = [
@@ -235,7 +367,7 @@ def extract_authors_enhanced(content: str) -> list:
         
         if html_authors:
             authors.extend(html_authors)
-            print(f"Strategy 5 (HTML structure) found authors: {html_authors}")
+            logger.debug("Strategy 5 (HTML structure) found authors: %s", html_authors)
         
         # Clean and validate authors
         cleaned_authors = []
@@ -259,15 +391,165 @@ def extract_authors_enhanced(content: str) -> list:
                 author not in cleaned_authors):  # No duplicates
                 cleaned_authors.append(author)
         
-        print(f"Final cleaned authors: {cleaned_authors}")
+        logger.debug("Final cleaned authors: %s", cleaned_authors)
         
         # Limit to first 5 authors and return
         return cleaned_authors[:5] if cleaned_authors else []
         
     except Exception as e:
-        print(f"Error in enhanced author extraction: {e}")
+        logger.error("Error in enhanced author extraction: %s", e)
         return []
 
+def fetched_document_metadata(document: dict, parsed: str, url: str = "") -> dict:
+    if document['kind'] == 'pdf':
+        source_info = parser_agent.extract_pdf_metadata(parsed)
+        source_info['url'] = url
+        return source_info
+    return extract_metadata_from_content(document['body'], url)
+
+def fetch_known_paper(url: str):
+    """
+    Fast path for arXiv and Semantic Scholar URLs: take metadata from the
+    paper store or the service API and fetch the canonical PDF directly.
+    Returns (paper, source info, fetched PDF or None), or None to use the
+    generic HTML path. Parsing is left to the caller's parser process.
+    """
+    known = search_agent.match_known_url(url)
+    if not known:
+        return None
+    
+    service, identifier = known
+    paper = paper_store.get_paper(identifier)
+    if paper is None:
+        if service == 'arxiv':
+            paper = synthesizer_agent.fetch_arxiv_paper(identifier)
+        else:
+            paper = synthesizer_agent.fetch_semantic_scholar_paper(identifier)
+        if not paper:
+            return None
+        paper_store.store_paper(paper)
+    logger.debug("Using %s metadata for %s", service, url)
+    
+    source_info = {
+        'title': paper.get('title') or 'Unknown Title',
+        'authors': list(paper.get('authors') or ['Unknown Author']),
+        'year': str(paper.get('year') or paper.get('published', '')[:4] or 'Unknown Year'),
+        'journal': paper.get('venue') or ('arXiv' if paper.get('arxiv_id') else 'Unknown Journal'),
+        'doi': paper.get('doi', ''),
+        'url': url
+    }
+    
+    document = None
+    if paper.get('pdf_url'):
+        try:
+            document = search_agent.fetch_document(paper['pdf_url'])
+        except Exception as e:
+            logger.error("Error fetching PDF %s: %s", paper['pdf_url'], e)
+    
+    return paper, source_info, document
+
+def known_paper_text(paper: dict, parsed: str) -> str:
+    """The parsed PDF text if usable, else the abstract if long enough, else "" """
+    if parsed and not parsed.startswith("Unable to extract") and parser_agent.is_valid_text(parsed):
+        return parsed
+    # No usable PDF: the abstract is enough for BART, which only reads 1024 characters
+    abstract = paper.get('summary') or ''
+    return abstract if len(abstract) >= MIN_ABSTRACT_LENGTH else ""
+
+def search_page_sizes(source: str, max_results: int) -> dict:
+    """Results requested from each search source for one page"""
+    if source.lower() == "arxiv":
+        return {"arxiv": max_results}
+    if source.lower() == "semantic_scholar":
+        return {"semantic_scholar": max_results}
+    # Try both sources
+    return {"arxiv": max_results // 2, "semantic_scholar": max_results // 2}
+
+def encode_search_cursor(offsets: dict):
+    """Opaque cursor holding the next offset of every source that has more results"""
+    if not offsets:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(offsets).encode()).decode()
+
+def decode_search_cursor(cursor: str) -> dict:
+    try:
+        offsets = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(offsets, dict) or not all(isinstance(value, int) and value >= 0 for value in offsets.values()):
+            raise ValueError
+        return offsets
+    except Exception:
+        raise ValueError("Invalid search cursor")
+
+def iter_search_page(query: str, page_sizes: dict, offsets: dict, page: dict):
+    """
+    Yield one page of search results as each source parses them. Sources
+    missing from `offsets` are exhausted. The offsets for the next page are
+    left in page['next_offsets'] once the generator finishes.
+    """
+    next_offsets = {}
+    page['next_offsets'] = next_offsets
+    page['errors'] = []
+    for name, page_size in page_sizes.items():
+        if name not in offsets or page_size <= 0:
+            continue
+        offset = offsets[name]
+        count = 0
+        try:
+            if name == "arxiv":
+                results = synthesizer_agent.iter_arxiv_papers(query, page_size, offset)
+            else:
+                results = synthesizer_agent.iter_semantic_scholar_papers(query, page_size, offset)
+            for paper in results:
+                count += 1
+                # Keep the results so /synthesize-papers/ can fetch the selected IDs
+                # locally; clients select papers by the returned store_id
+                paper['store_id'] = paper_store.store_paper(paper)
+                yield paper
+        except Exception as e:
+            logger.error("Error searching %s: %s", name, e)
+            metrics.UPSTREAM_ERRORS.inc(upstream=name)
+            page['errors'].append(f"{name}: {e}")
+            # Let the client retry the rest of this source with the next cursor
+            next_offsets[name] = offset + count
+            continue
+        # A full page means the source may have more results
+        if count == page_size:
+            next_offsets[name] = offset + count
+
+def stream_search_page(query: str, page_sizes: dict, offsets: dict):
+    """NDJSON stream: one line per paper as soon as it is parsed, then a closing line with the next cursor"""
+    page = {}
+    total_found = 0
+    for paper in iter_search_page(query, page_sizes, offsets, page):
+        total_found += 1
+        yield json.dumps({"type": "paper", "paper": paper}) + "\n"
+    yield json.dumps({
+        "type": "end",
+        "query": query,
+        "total_found": total_found,
+        "next_cursor": encode_search_cursor(page['next_offsets']),
+        "errors": page['errors']
+    }) + "\n"
+
+def search_all_sources(query: str, max_results: int) -> list:
+    """Search arXiv and Semantic Scholar for the same query"""
+    papers = synthesizer_agent.search_arxiv_papers(query, max_results)
+    papers.extend(synthesizer_agent.search_semantic_scholar_papers(query, max_results))
+    return papers
+
+def store_processed_paper(source_info: dict, summary: str, text: str, source: str) -> str:
+    """Add a processed paper to the paper store so it can be selected for synthesis"""
+    return paper_store.store_paper({
+        'title': source_info.get('title', 'Unknown Title'),
+        'authors': source_info.get('authors', []),
+        'year': source_info.get('year', ''),
+        'summary': summary,
+        'doi': source_info.get('doi', ''),
+        'url': source_info.get('url', ''),
+        'content_hash': paper_store.content_hash(text),
+        'source': source
+    })
+
 def generate_citation(source_info, citation_type="apa"):
     """Generate citations in different formats"""
     if not source_info:
@@ -327,45 +609,382 @@ async def ping():
 
 @app.get("/health")
 async def health_check():
+    stats = await executors.run_io(storage.inventory_stats)
     return {
         "status": "healthy",
         "data_directory": os.path.exists(data_dir),
-        "audio_files": len([f for f in os.listdir(data_dir) if f.endswith('.mp3')]) if os.path.exists(data_dir) else 0
+        "audio_files": stats['audio_files'],
+        "storage": stats,
+        "response_cache": response_cache.cache_stats()
+    }
+
+def collect_queue_depths() -> dict:
+    return {
+        ("audio",): audio_jobs.pending_job_count(),
+        ("jobs",): job_queue.queue_depth(),
+        ("summary_batch",): SUMMARY_BATCHER.pending_count(),
+        ("response_in_flight",): response_cache.cache_stats()['in_flight']
+    }
+
+def collect_pool_stats(field: str) -> dict:
+    stats = executors.pool_stats()
+    stats['audio'] = {'workers': Config.get_audio_workers(), 'busy': min(audio_jobs.pending_job_count(), Config.get_audio_workers())}
+    if field == 'utilization':
+        return {(name,): pool['busy'] / pool['workers'] for name, pool in stats.items() if pool['workers']}
+    return {(name,): pool[field] for name, pool in stats.items()}
+
+# Read at scrape time; the latency and event metrics live in metrics.py
+metrics.Gauge("paperanalyzer_queue_depth", "Work waiting or running, per queue",
+              ("queue",), collect=collect_queue_depths)
+metrics.Gauge("paperanalyzer_pool_busy_workers", "Busy workers per executor pool",
+              ("pool",), collect=lambda: collect_pool_stats('busy'))
+metrics.Gauge("paperanalyzer_pool_utilization", "Busy workers as a fraction of the pool size",
+              ("pool",), collect=lambda: collect_pool_stats('utilization'))
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this process"""
+    text = await executors.run_io(metrics.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+def is_admin(request: Request) -> bool:
+    """Whether the request carries the configured X-Admin-Token (admin features are off without one)"""
+    token = Config.get_admin_token()
+    return bool(token) and hmac.compare_digest(request.headers.get("x-admin-token", ""), token)
+
+def require_admin(request: Request):
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request, format: str = "json"):
+    """A profile's summary (peak and retained memory), or its folded stacks with format=folded"""
+    require_admin(request)
+    path = profiling.profile_path(profile_id, "folded" if format == "folded" else "json")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
+    with open(path) as f:
+        return json.load(f)
+
+@app.get("/debug/imports")
+async def get_import_report(request: Request, limit: int = 20):
+    """Import times at startup and since (lazy agent loads, warmup), slowest modules first"""
+    require_admin(request)
+    report = import_timing.report(limit=max(1, min(limit, 200)))
+    report['agents'] = agents.load_times()
+    return report
+
+@app.delete("/cache/responses")
+async def invalidate_response_cache(request: Request, doi: str = "", url: str = ""):
+    """Drop cached responses for a DOI or URL (all topic sets), or the whole cache"""
+    require_admin(request)
+    if doi:
+        removed = response_cache.invalidate_matching(f"doi:{search_agent.normalize_doi(doi)}|")
+    elif url:
+        removed = response_cache.invalidate_matching(f"url:{response_cache.normalize_url(url)}|")
+    else:
+        removed = response_cache.clear()
+    return {"removed": removed}
+
+def audio_stream_url(audio_job) -> str:
+    """Deterministic URL (relative to the API root) that materializes a narration on first GET"""
+    return f"audio/{audio_job}/stream" if audio_job else ""
+
+@app.get("/audio/{job_id}")
+async def audio_job_status(job_id: str):
+    """
+    Status of an audio job: idle (registered but never requested), pending,
+    ready (with the audio URL) or failed. Polling does not start synthesis.
+    """
+    job = audio_jobs.get_audio_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown audio job")
+    return job
+
+@app.get("/audio/{job_id}/stream")
+async def stream_audio(job_id: str):
+    """
+    Narration audio for a job. While synthesis is running, MP3 frames are
+    sent with chunked transfer as each chunk finishes so playback can start
+    early. Once the file exists it is served as a regular file response
+    (byte ranges, ETag, sendfile where the server supports it) with
+    long-lived cache headers, since audio files are content-addressed.
+    The first request for a registered narration starts its synthesis;
+    concurrent requests share the same job.
+    """
+    job = audio_jobs.request_narration(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown audio job")
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'] or "Audio generation failed")
+    if job['status'] == 'ready':
+        if not os.path.exists(job['audio']):
+            raise HTTPException(status_code=404, detail="Audio file is no longer available")
+        return FileResponse(
+            job['audio'],
+            media_type="audio/mpeg",
+            headers={"Cache-Control": "public, max-age=31536000, immutable"}
+        )
+    return StreamingResponse(
+        audio_jobs.iter_job_audio(job_id),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-store"}
+    )
+
+class PipelineError(Exception):
+    """A request that cannot succeed on retry, with the HTTP status and response body to return"""
+    def __init__(self, status_code: int, content: dict):
+        super().__init__(content.get('error', ''))
+        self.status_code = status_code
+        self.content = content
+
+def enqueue_job(kind: str, payload: dict) -> JSONResponse:
+    """Queue a pipeline run for the worker processes (see worker.py) and return its job ID"""
+    job_id = job_queue.enqueue(kind, payload)
+    logger.info("Queued %s job %s", kind, job_id)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "status_url": f"jobs/{job_id}"}
+    )
+
+def adopt_job_artifacts(artifacts: dict):
+    """Register papers and narrations a worker produced so this process can serve them"""
+    paper_store.store_papers(artifacts.get('papers', []))
+    for text in artifacts.get('narrations', []):
+        audio_jobs.register_narration(text)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status of a queued pipeline job: queued, running, succeeded (with the result) or failed"""
+    job = await executors.run_io(job_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if job['status'] == 'succeeded' and job['artifacts']:
+        adopt_job_artifacts(job['artifacts'])
+    return {
+        "job_id": job['job_id'],
+        "kind": job['kind'],
+        "status": job['status'],
+        "attempts": job['attempts'],
+        "error": job['error'],
+        "result": job['result'],
+        "created_at": job['created_at'],
+        "updated_at": job['updated_at']
+    }
+
+# Pipeline stages shared by /process-url/, /process-doi/ and /upload/.
+# Each declares its inputs and outputs in the Pipeline definitions below;
+# classification, summarization and metadata extraction run concurrently
+# once the text is available.
+
+async def fetch_url_stage(url: str) -> dict:
+    # arXiv and Semantic Scholar URLs skip the HTML scrape entirely
+    known_paper = await executors.run_io(fetch_known_paper, url)
+    if known_paper:
+        paper, known_info, document = known_paper
+        parsed = ""
+        if document is not None:
+            try:
+                parsed = await executors.run_cpu(parser_agent.extract_document_text, document)
+            except Exception as e:
+                logger.error("Error parsing PDF %s: %s", paper['pdf_url'], e)
+        parsed = known_paper_text(paper, parsed)
+        if parsed:
+            return {'document': {'kind': 'text', 'body': parsed}, 'known_info': known_info}
+    document = await executors.run_io(search_agent.fetch_document, url)
+    return {'document': document, 'known_info': {}}
+
+async def resolve_doi_stage(doi: str) -> dict:
+    return await executors.run_io(search_agent.resolve_doi_metadata, doi)
+
+async def fetch_doi_stage(doi: str, doi_info: dict) -> dict:
+    # Only fetch the landing page when the registry has no metadata or no
+    # abstract long enough to summarize
+    abstract = doi_info.get('abstract', '')
+    if doi_info and len(abstract) >= MIN_ABSTRACT_LENGTH:
+        logger.debug("Using registry abstract for DOI %s (%s characters)", doi, len(abstract))
+        return {'kind': 'text', 'body': abstract}
+    return await executors.run_io(search_agent.fetch_document, doi_landing_url(doi))
+
+async def parse_stage(document: dict) -> str:
+    if document['kind'] == 'text':
+        return document['body']
+    return await executors.run_cpu(parser_agent.extract_document_text, document)
+
+async def parse_upload_stage(contents: bytes) -> str:
+    paper_text = await executors.run_cpu(parser_agent.extract_text_from_pdf_bytes, contents)
+    
+    # Check if PDF parsing was successful
+    if paper_text.startswith("Error:") or paper_text.startswith("Unable to extract"):
+        raise PipelineError(400, {
+            "error": paper_text,
+            "summary": "PDF processing failed",
+            "classification": "Error",
+            "audio": "",
+            "source_info": {},
+            "citations": {}
+        })
+    return paper_text
+
+async def url_metadata_stage(url: str, document: dict, parsed: str, known_info: dict) -> dict:
+    if known_info:
+        source_info = dict(known_info)
+    else:
+        source_info = await executors.run_io(fetched_document_metadata, document, parsed, url)
+    # Add access information to the extracted source information
+    source_info['access_date'] = datetime.now().strftime("%Y-%m-%d")
+    return source_info
+
+async def doi_metadata_stage(doi: str, doi_info: dict, document: dict, parsed: str) -> dict:
+    source_info = dict(doi_info)
+    if not source_info:
+        source_info = await executors.run_io(fetched_document_metadata, document, parsed, doi_landing_url(doi))
+    # Add DOI and access information to the extracted source information
+    source_info['doi'] = doi.strip()
+    source_info['access_date'] = datetime.now().strftime("%Y-%m-%d")
+    return source_info
+
+async def upload_metadata_stage(filename: str, contents: bytes, parsed: str) -> dict:
+    # Extract metadata from PDF content
+    pdf_metadata = await executors.run_cpu(parser_agent.extract_pdf_metadata, parsed)
+    return {
+        'filename': filename,
+        'title': pdf_metadata.get('title', 'Uploaded Document'),
+        'authors': pdf_metadata.get('authors', ['Unknown Author']),
+        'year': pdf_metadata.get('year', 'Unknown Year'),
+        'journal': pdf_metadata.get('journal', 'Uploaded Document'),
+        'doi': pdf_metadata.get('doi', ''),
+        'access_date': datetime.now().strftime("%Y-%m-%d"),
+        'file_size': len(contents)
+    }
+
+async def classify_stage(parsed: str, topics: str) -> str:
+    # A few difflib lookups: cheaper inline than pickling the text to a parser process
+    return classifier_agent.classify(parsed, topics.split(","))
+
+async def summarize_stage(parsed: str) -> str:
+    return await executors.run_model(summarizer_agent.generate_summary, parsed)
+
+def summarize_batch(texts: list) -> list:
+    # Looked up per call so building the batcher does not import the summarizer
+    return summarizer_agent.generate_summaries(texts)
+
+# Concurrent summaries share one batched model call (used by /process-batch/)
+SUMMARY_BATCHER = MicroBatcher(
+    "summarize",
+    summarize_batch,
+    executors.run_model,
+    max_size=Config.get_summary_batch_size,
+    max_wait=Config.get_summary_batch_wait
+)
+
+async def batched_summarize_stage(parsed: str) -> str:
+    return await SUMMARY_BATCHER.submit(parsed)
+
+async def narration_stage(summary: str) -> str:
+    # Narration is synthesized on the first request for its audio URL
+    return audio_jobs.register_narration(summary)
+
+async def citations_stage(source_info: dict) -> dict:
+    return generate_citation(source_info, "all")
+
+async def store_stage(source_info: dict, summary: str, parsed: str, source: str) -> str:
+    # Make the paper available to /synthesize-papers/
+    return store_processed_paper(source_info, summary, parsed, source)
+
+def doi_landing_url(doi: str) -> str:
+    return f"{Config.get_doi_resolver_url()}/{doi.strip()}"
+
+def is_cacheable_summary(outputs: dict) -> bool:
+    """Model failures come back as error text; only cache real summaries"""
+    summary = outputs['summary']
+    return not (summary.startswith("Error") or summary.startswith("Document Processing Error"))
+
+# Summaries and classifications depend only on the text, so re-processing
+# the same paper (from any endpoint) skips the model
+STAGE_CACHE = StageCache()
+
+def paper_stages(summarize) -> list:
+    """Stages after text extraction, common to every paper pipeline"""
+    return [
+        Stage("classify", classify_stage, ["parsed", "topics"], ["classification"],
+              cache_key=lambda inputs: paper_store.content_hash(f"{inputs['topics']}\n{inputs['parsed']}")),
+        Stage("summarize", summarize, ["parsed"], ["summary"],
+              cache_key=lambda inputs: paper_store.content_hash(inputs['parsed']),
+              cache_if=is_cacheable_summary),
+        Stage("narration", narration_stage, ["summary"], ["audio_job"]),
+        Stage("citations", citations_stage, ["source_info"], ["citations"]),
+        Stage("store", store_stage, ["source_info", "summary", "parsed", "source"], ["paper_id"])
+    ]
+
+def build_pipelines(summarize) -> dict:
+    """The URL, DOI and upload pipelines around a summarize stage function"""
+    return {
+        "url": Pipeline("process_url", [
+            Stage("fetch", fetch_url_stage, ["url"], ["document", "known_info"]),
+            Stage("parse", parse_stage, ["document"], ["parsed"]),
+            Stage("metadata", url_metadata_stage, ["url", "document", "parsed", "known_info"], ["source_info"]),
+        ] + paper_stages(summarize), cache=STAGE_CACHE),
+        "doi": Pipeline("process_doi", [
+            Stage("resolve_doi", resolve_doi_stage, ["doi"], ["doi_info"]),
+            Stage("fetch", fetch_doi_stage, ["doi", "doi_info"], ["document"]),
+            Stage("parse", parse_stage, ["document"], ["parsed"]),
+            Stage("metadata", doi_metadata_stage, ["doi", "doi_info", "document", "parsed"], ["source_info"]),
+        ] + paper_stages(summarize), cache=STAGE_CACHE),
+        "pdf": Pipeline("upload", [
+            Stage("parse", parse_upload_stage, ["contents"], ["parsed"]),
+            Stage("metadata", upload_metadata_stage, ["filename", "contents", "parsed"], ["source_info"]),
+        ] + paper_stages(summarize), cache=STAGE_CACHE)
     }
 
+PIPELINES = build_pipelines(summarize_stage)
+# Batch items summarize through SUMMARY_BATCHER
+BATCH_PIPELINES = build_pipelines(batched_summarize_stage)
+
+async def cached_paper_response(key: str, compute, refresh: bool = False) -> dict:
+    """
+    Response for a normalized request from the response cache, computing it
+    once for all identical concurrent requests. refresh recomputes it.
+    """
+    if refresh:
+        response_cache.invalidate(key)
+    response = await response_cache.get_or_compute(key, compute, cacheable=is_cacheable_summary)
+    # A cached response can outlive its narration text in this process; the
+    # audio ID is a hash of the summary, so registering again restores it
+    if response.get('audio_job'):
+        audio_jobs.register_narration(response['summary'])
+    return response
+
+def paper_response(values: dict) -> dict:
+    """Response body of the paper endpoints from a finished pipeline run"""
+    return {
+        "summary": values['summary'],
+        "classification": values['classification'],
+        "audio": "",
+        "audio_job": values['audio_job'],
+        "audio_url": audio_stream_url(values['audio_job']),
+        "source_info": values['source_info'],
+        "citations": values['citations'],
+        "paper_id": values['paper_id']
+    }
+
+async def run_process_url(url: str, topics: str, pipelines: dict = PIPELINES, refresh: bool = False) -> dict:
+    async def compute():
+        values = await pipelines["url"].run({"url": url, "topics": topics, "source": "url"})
+        return paper_response(values)
+    return await cached_paper_response(response_cache.url_key(url, topics), compute, refresh)
+
 @app.post("/process-url/")
-async def process_url(url: str, topics: str = Form(...)):
+async def process_url(url: str, topics: str = Form(...), async_mode: bool = Form(False), refresh: bool = Form(False)):
+    if async_mode:
+        return enqueue_job("process_url", {"url": url, "topics": topics, "refresh": refresh})
     try:
-        paper_content = search_agent.fetch_paper(url)
-        parsed = parser_agent.extract_text(paper_content)
-        classification = classifier_agent.classify(parsed, topics.split(","))
-        summary = summarizer_agent.generate_summary(parsed)
-        audio_path = audio_agent.generate_audio(summary)
-        
-        # Extract source information
-        source_info = extract_metadata_from_content(paper_content, url)
-        source_info['access_date'] = datetime.now().strftime("%Y-%m-%d")
-        
-        # Generate citations
-        citations = generate_citation(source_info, "all")
-        
-        # Verify audio file was created
-        audio_file_path = os.path.join(data_dir, audio_path.replace("data/", ""))
-        if not os.path.exists(audio_file_path):
-            print(f"Warning: Audio file not found at {audio_file_path}")
-            audio_path = ""
-        
-        return {
-            "summary": summary,
-            "classification": classification,
-            "audio": audio_path,
-            "source_info": source_info,
-            "citations": citations
-        }
+        return await run_process_url(url, topics, refresh=refresh)
     except Exception as e:
         error_msg = f"Error processing URL: {str(e)}"
-        print(f"Error: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("%s", error_msg)
         return JSONResponse(
             status_code=500,
             content={
@@ -379,29 +998,51 @@ async def process_url(url: str, topics: str = Form(...)):
         )
 
 @app.post("/search-papers/")
-async def search_papers(query: str = Form(...), source: str = Form("arxiv"), max_results: int = Form(10)):
-    """Search for papers using free APIs"""
+async def search_papers(
+    query: str = Form(...),
+    source: str = Form("arxiv"),
+    max_results: int = Form(10),
+    cursor: str = Form(""),
+    stream: bool = Form(False)
+):
+    """Search for papers using free APIs, one cursor page at a time"""
     try:
-        if source.lower() == "arxiv":
-            papers = synthesizer_agent.search_arxiv_papers(query, max_results)
-        elif source.lower() == "semantic_scholar":
-            papers = synthesizer_agent.search_semantic_scholar_papers(query, max_results)
-        else:
-            # Try both sources
-            arxiv_papers = synthesizer_agent.search_arxiv_papers(query, max_results // 2)
-            semantic_papers = synthesizer_agent.search_semantic_scholar_papers(query, max_results // 2)
-            papers = arxiv_papers + semantic_papers
+        page_sizes = search_page_sizes(source, max_results)
+        offsets = decode_search_cursor(cursor) if cursor else {name: 0 for name in page_sizes}
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": str(e),
+                "papers": [],
+                "query": query,
+                "source": source,
+                "total_found": 0,
+                "next_cursor": None
+            }
+        )
+    
+    if stream:
+        return StreamingResponse(
+            stream_search_page(query, page_sizes, offsets),
+            media_type="application/x-ndjson"
+        )
+    
+    try:
+        page = {}
+        papers = await executors.run_io(lambda: list(iter_search_page(query, page_sizes, offsets, page)))
         
         return {
             "papers": papers,
             "query": query,
             "source": source,
-            "total_found": len(papers)
+            "total_found": len(papers),
+            "next_cursor": encode_search_cursor(page['next_offsets']),
+            "errors": page['errors']
         }
     except Exception as e:
         error_msg = f"Error searching papers: {str(e)}"
-        print(f"Error: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("%s", error_msg)
         return JSONResponse(
             status_code=500,
             content={
@@ -409,111 +1050,94 @@ async def search_papers(query: str = Form(...), source: str = Form("arxiv"), max
                 "papers": [],
                 "query": query,
                 "source": source,
-                "total_found": 0
+                "total_found": 0,
+                "next_cursor": None
             }
         )
 
+async def run_synthesis(papers: list, synthesis_type: str) -> dict:
+    # Generate synthesis
+    with metrics.STAGE_SECONDS.time(pipeline="synthesis", stage="synthesis"):
+        synthesis_result = await executors.run_cpu(synthesizer_agent.synthesize_papers, papers, synthesis_type)
+    
+    # Validate synthesis result
+    if not synthesis_result or not synthesis_result.get('synthesis'):
+        raise Exception("Failed to generate synthesis content")
+    
+    synthesis_text = synthesis_result['synthesis']
+    if not isinstance(synthesis_text, str) or not synthesis_text.strip():
+        raise Exception("Generated synthesis is empty or invalid")
+    
+    # Narration for the synthesis is synthesized on first request
+    audio_job = None
+    if not synthesis_text.startswith("Error:"):
+        logger.debug("Registering narration for synthesis (length: %s characters)", len(synthesis_text))
+        audio_job = audio_jobs.register_narration(synthesis_text)
+    else:
+        logger.info("Skipping audio generation for error synthesis: %s...", synthesis_text[:100])
+    
+    return {
+        "synthesis": synthesis_result['synthesis'],
+        "paper_analyses": synthesis_result['paper_analyses'],
+        "common_themes": synthesis_result['common_themes'],
+        "conflicting_findings": synthesis_result['conflicting_findings'],
+        "synthesis_type": synthesis_result['synthesis_type'],
+        "total_papers": synthesis_result['total_papers'],
+        "audio": "",
+        "audio_job": audio_job,
+        "audio_url": audio_stream_url(audio_job),
+        "generated_at": synthesis_result['generated_at']
+    }
+
+async def resolve_synthesis_papers(paper_ids: str, query: str) -> list:
+    """
+    Exactly the selected papers, from the paper store. IDs the store has not
+    seen (e.g. after a restart) are looked up by searching for the query once;
+    any still unknown fail the request rather than being replaced.
+    """
+    # Parse paper IDs (comma-separated)
+    paper_id_list = [pid.strip() for pid in paper_ids.split(",") if pid.strip()]
+    if not paper_id_list:
+        raise PipelineError(422, {"error": "Select at least one paper to synthesize", "missing_ids": []})
+    
+    # Fetch the selected papers from the paper store
+    papers, missing_ids = paper_store.get_papers(paper_id_list)
+    
+    if query and missing_ids:
+        logger.debug("Paper store is missing %s of %s requested papers, searching for '%s'", len(missing_ids), len(paper_id_list), query)
+        search_results = await executors.run_io(search_all_sources, query, max(len(missing_ids), 5))
+        paper_store.store_papers(search_results)
+        found, missing_ids = paper_store.get_papers(missing_ids)
+        known = {id(paper) for paper in papers}
+        papers.extend(paper for paper in found if id(paper) not in known)
+    
+    if missing_ids:
+        logger.info("Cannot synthesize, unknown paper IDs: %s", missing_ids)
+        raise PipelineError(404, {
+            "error": "Some selected papers are no longer available; search again and reselect them",
+            "missing_ids": missing_ids
+        })
+    return papers
+
 @app.post("/synthesize-papers/")
 async def synthesize_papers_endpoint(
     paper_ids: str = Form(...), 
     synthesis_type: str = Form("comprehensive"),
-    query: str = Form("")
+    query: str = Form(""),
+    async_mode: bool = Form(False)
 ):
     """Synthesize multiple papers"""
     try:
-        # Parse paper IDs (comma-separated)
-        paper_id_list = [pid.strip() for pid in paper_ids.split(",") if pid.strip()]
-        
-        # For now, we'll use the query to search for papers and synthesize them
-        # In a full implementation, you'd store paper data and retrieve by IDs
-        if query:
-            # Search for papers using the query
-            papers = synthesizer_agent.search_arxiv_papers(query, len(paper_id_list) or 5)
-            papers.extend(synthesizer_agent.search_semantic_scholar_papers(query, len(paper_id_list) or 5))
-        else:
-            # Use dummy data for demonstration
-            papers = [
-                {
-                    'title': 'Sample Research Paper 1',
-                    'authors': ['Author A', 'Author B'],
-                    'summary': 'This paper discusses machine learning approaches for data analysis.',
-                    'year': '2023',
-                    'source': 'arxiv'
-                },
-                {
-                    'title': 'Sample Research Paper 2', 
-                    'authors': ['Author C', 'Author D'],
-                    'summary': 'This research explores deep learning methods and their applications.',
-                    'year': '2023',
-                    'source': 'semantic_scholar'
-                }
-            ]
-        
-        # Generate synthesis
-        synthesis_result = synthesizer_agent.synthesize_papers(papers, synthesis_type)
-        
-        # Validate synthesis result
-        if not synthesis_result or not synthesis_result.get('synthesis'):
-            raise Exception("Failed to generate synthesis content")
-        
-        synthesis_text = synthesis_result['synthesis']
-        if not isinstance(synthesis_text, str) or not synthesis_text.strip():
-            raise Exception("Generated synthesis is empty or invalid")
-        
-        # Additional validation to prevent NoneType errors
-        if synthesis_text is None:
-            synthesis_text = "Error: Synthesis generation returned None"
-        elif not synthesis_text.strip():
-            synthesis_text = "Error: Generated synthesis is empty"
-        
-        # Generate audio for the synthesis
-        audio_path = ""
-        try:
-            if synthesis_text and synthesis_text.strip() and not synthesis_text.startswith("Error:"):
-                print(f"Generating audio for synthesis (length: {len(synthesis_text)} characters)")
-                print(f"Synthesis preview: {synthesis_text[:200]}...")
-                
-                # Truncate synthesis for audio if it's too long
-                audio_text = synthesis_text
-                if len(audio_text) > 3000:
-                    # Take the first part and add a note
-                    audio_text = synthesis_text[:3000] + "\n\n[Audio truncated due to length]"
-                    print(f"Truncated synthesis for audio generation to {len(audio_text)} characters")
-                
-                audio_path = audio_agent.generate_audio(audio_text)
-                print(f"Audio generated successfully: {audio_path}")
-                
-                # Verify audio file was created
-                if audio_path:
-                    audio_file_path = os.path.join(data_dir, audio_path.replace("data/", ""))
-                    if not os.path.exists(audio_file_path):
-                        print(f"Warning: Audio file not found at {audio_file_path}")
-                        audio_path = ""
-                    else:
-                        print(f"Audio file verified at {audio_file_path}")
-                else:
-                    print("Audio generation returned empty path")
-            else:
-                print(f"Skipping audio generation for error synthesis: {synthesis_text[:100]}...")
-        except Exception as audio_error:
-            print(f"Audio generation failed: {audio_error}")
-            print(f"Audio error traceback: {traceback.format_exc()}")
-            audio_path = ""
-        
-        return {
-            "synthesis": synthesis_result['synthesis'],
-            "paper_analyses": synthesis_result['paper_analyses'],
-            "common_themes": synthesis_result['common_themes'],
-            "conflicting_findings": synthesis_result['conflicting_findings'],
-            "synthesis_type": synthesis_result['synthesis_type'],
-            "total_papers": synthesis_result['total_papers'],
-            "audio": audio_path,
-            "generated_at": synthesis_result['generated_at']
-        }
+        # Papers are resolved here since the paper store lives in this process
+        papers = await resolve_synthesis_papers(paper_ids, query)
+        if async_mode:
+            return enqueue_job("synthesize", {"papers": papers, "synthesis_type": synthesis_type})
+        return await run_synthesis(papers, synthesis_type)
+    except PipelineError as e:
+        return JSONResponse(status_code=e.status_code, content=e.content)
     except Exception as e:
         error_msg = f"Error synthesizing papers: {str(e)}"
-        print(f"Error: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("%s", error_msg)
         return JSONResponse(
             status_code=500,
             content={
@@ -529,45 +1153,22 @@ async def synthesize_papers_endpoint(
             }
         )
 
+async def run_process_doi(doi: str, topics: str, pipelines: dict = PIPELINES, refresh: bool = False) -> dict:
+    async def compute():
+        logger.debug("Processing DOI: %s -> URL: %s", doi, doi_landing_url(doi))
+        values = await pipelines["doi"].run({"doi": doi, "topics": topics, "source": "doi"})
+        return paper_response(values)
+    return await cached_paper_response(response_cache.doi_key(doi, topics), compute, refresh)
+
 @app.post("/process-doi/")
-async def process_doi(doi: str = Form(...), topics: str = Form(...)):
+async def process_doi(doi: str = Form(...), topics: str = Form(...), async_mode: bool = Form(False), refresh: bool = Form(False)):
+    if async_mode:
+        return enqueue_job("process_doi", {"doi": doi, "topics": topics, "refresh": refresh})
     try:
-        # Convert DOI to URL
-        doi_url = f"https://doi.org/{doi.strip()}"
-        print(f"Processing DOI: {doi} -> URL: {doi_url}")
-        
-        # Fetch paper from DOI URL
-        paper_content = search_agent.fetch_paper(doi_url)
-        parsed = parser_agent.extract_text(paper_content)
-        classification = classifier_agent.classify(parsed, topics.split(","))
-        summary = summarizer_agent.generate_summary(parsed)
-        audio_path = audio_agent.generate_audio(summary)
-        
-        # Extract source information
-        source_info = extract_metadata_from_content(paper_content, doi_url)
-        source_info['doi'] = doi.strip()
-        source_info['access_date'] = datetime.now().strftime("%Y-%m-%d")
-        
-        # Generate citations
-        citations = generate_citation(source_info, "all")
-        
-        # Verify audio file was created
-        audio_file_path = os.path.join(data_dir, audio_path.replace("data/", ""))
-        if not os.path.exists(audio_file_path):
-            print(f"Warning: Audio file not found at {audio_file_path}")
-            audio_path = ""
-        
-        return {
-            "summary": summary,
-            "classification": classification,
-            "audio": audio_path,
-            "source_info": source_info,
-            "citations": citations
-        }
+        return await run_process_doi(doi, topics, refresh=refresh)
     except Exception as e:
         error_msg = f"Error processing DOI: {str(e)}"
-        print(f"Error: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("%s", error_msg)
         return JSONResponse(
             status_code=500,
             content={
@@ -580,8 +1181,22 @@ async def process_doi(doi: str = Form(...), topics: str = Form(...)):
             }
         )
 
+async def run_upload(contents: bytes, filename: str, topics: str, pipelines: dict = PIPELINES, refresh: bool = False) -> dict:
+    async def compute():
+        values = await pipelines["pdf"].run({"contents": contents, "filename": filename, "topics": topics, "source": "upload"})
+        return paper_response(values)
+    return await cached_paper_response(response_cache.pdf_key(contents, topics), compute, refresh)
+
+async def run_upload_job(upload_path: str, filename: str, topics: str, refresh: bool = False) -> dict:
+    """run_upload for a queued upload saved under the data directory"""
+    def read_upload():
+        with open(os.path.join(storage.DATA_DIR, upload_path), 'rb') as f:
+            return f.read()
+    contents = await executors.run_io(read_upload)
+    return await run_upload(contents, filename, topics, refresh=refresh)
+
 @app.post("/upload/")
-async def upload_paper(file: UploadFile, topics: str = Form(...)):
+async def upload_paper(file: UploadFile, topics: str = Form(...), async_mode: bool = Form(False), refresh: bool = Form(False)):
     try:
         # Validate file type
         if not file.filename.lower().endswith('.pdf'):
@@ -597,69 +1212,16 @@ async def upload_paper(file: UploadFile, topics: str = Form(...)):
                 }
             )
         
-        paper_text = await parser_agent.read_pdf(file)
-        
-        # Check if PDF parsing was successful
-        if paper_text.startswith("Error:") or paper_text.startswith("Unable to extract"):
-            return JSONResponse(
-                status_code=400,
-                content={
-                    "error": paper_text,
-                    "summary": "PDF processing failed",
-                    "classification": "Error",
-                    "audio": "",
-                    "source_info": {},
-                    "citations": {}
-                }
-            )
-        
-        classification = classifier_agent.classify(paper_text, topics.split(","))
-        summary = summarizer_agent.generate_summary(paper_text)
-        print(f"Generated summary: {summary[:100]}...")
-        
-        audio_path = audio_agent.generate_audio(summary)
-        print(f"Audio generation result: {audio_path}")
-        
-        # Extract metadata from PDF content
-        pdf_metadata = parser_agent.extract_pdf_metadata(paper_text)
-        
-        # Create source information with extracted metadata
-        source_info = {
-            'filename': file.filename,
-            'title': pdf_metadata.get('title', 'Uploaded Document'),
-            'authors': pdf_metadata.get('authors', ['Unknown Author']),
-            'year': pdf_metadata.get('year', 'Unknown Year'),
-            'journal': pdf_metadata.get('journal', 'Uploaded Document'),
-            'doi': pdf_metadata.get('doi', ''),
-            'access_date': datetime.now().strftime("%Y-%m-%d"),
-            'file_size': file.size if hasattr(file, 'size') else 'Unknown'
-        }
-        
-        # Generate citations
-        citations = generate_citation(source_info, "all")
-        
-        # Verify audio file was created
-        if audio_path:
-            audio_file_path = os.path.join(data_dir, audio_path.replace("data/", ""))
-            if not os.path.exists(audio_file_path):
-                print(f"Warning: Audio file not found at {audio_file_path}")
-                audio_path = ""
-            else:
-                print(f"Audio file verified at: {audio_file_path}")
-        else:
-            print("No audio path returned from audio generation")
-        
-        return {
-            "summary": summary,
-            "classification": classification,
-            "audio": audio_path,
-            "source_info": source_info,
-            "citations": citations
-        }
+        contents = await file.read()
+        upload_path = await executors.run_io(parser_agent.save_upload, contents, file.filename)
+        if async_mode:
+            return enqueue_job("upload", {"upload_path": upload_path, "filename": file.filename, "topics": topics, "refresh": refresh})
+        return await run_upload(contents, file.filename, topics, refresh=refresh)
+    except PipelineError as e:
+        return JSONResponse(status_code=e.status_code, content=e.content)
     except Exception as e:
         error_msg = f"Error processing uploaded file: {str(e)}"
-        print(f"Error: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("%s", error_msg)
         return JSONResponse(
             status_code=500,
             content={
@@ -671,3 +1233,99 @@ async def upload_paper(file: UploadFile, topics: str = Form(...)):
                 "citations": {}
             }
         )
+
+async def run_batch_item(item: dict, topics: str) -> dict:
+    """One /process-batch/ item as an NDJSON record; failures are reported, not raised"""
+    record = {"index": item['index'], "type": item['type'], "input": item['input']}
+    try:
+        if item['type'] == 'doi':
+            result = await run_process_doi(item['input'], topics, BATCH_PIPELINES)
+        elif item['type'] == 'url':
+            result = await run_process_url(item['input'], topics, BATCH_PIPELINES)
+        elif not item['input'].lower().endswith('.pdf'):
+            raise PipelineError(400, {"error": "Only PDF files are supported"})
+        else:
+            result = await run_upload(item['contents'], item['input'], topics, BATCH_PIPELINES)
+        record.update(status="ok", result=result)
+    except PipelineError as e:
+        record.update(status="error", error=str(e))
+    except Exception as e:
+        logger.warning("Batch item %s (%s %s) failed: %s", item['index'], item['type'], item['input'], e)
+        record.update(status="error", error=str(e))
+    return record
+
+async def stream_batch(items: list, topics: str):
+    """
+    Run batch items concurrently and yield one NDJSON line per item as it
+    finishes, then a summary line. Items overlap across the I/O, parser and
+    model pools, so throughput follows the slowest stage.
+    """
+    semaphore = asyncio.Semaphore(Config.get_batch_concurrency())
+    
+    async def run_item(item):
+        async with semaphore:
+            return await run_batch_item(item, topics)
+    
+    tasks = [asyncio.ensure_future(run_item(item)) for item in items]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            if record['status'] == 'ok':
+                succeeded += 1
+            yield json.dumps(record) + "\n"
+    finally:
+        # The client went away: stop the remaining items
+        for task in tasks:
+            task.cancel()
+    yield json.dumps({"done": True, "total": len(items), "succeeded": succeeded,
+                      "failed": len(items) - succeeded}) + "\n"
+
+@app.post("/process-batch/")
+async def process_batch(
+    topics: str = Form(...),
+    dois: str = Form(""),
+    urls: str = Form(""),
+    files: List[UploadFile] = File(default=[])
+):
+    """
+    Process a reading list in one call: DOIs (separated by commas or
+    whitespace), URLs (separated by whitespace) and PDF files. Results stream
+    back as NDJSON, one record per item with its index, in completion order.
+    """
+    items = []
+    for doi in re.split(r'[\s,]+', dois.strip()):
+        if doi:
+            items.append({"type": "doi", "input": doi})
+    for url in urls.split():
+        items.append({"type": "url", "input": url})
+    
+    # Validate before reading or saving any upload
+    item_count = len(items) + len(files)
+    if not item_count:
+        return JSONResponse(status_code=400, content={"error": "Provide at least one DOI, URL or PDF file"})
+    if item_count > Config.get_batch_max_items():
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"A batch can contain at most {Config.get_batch_max_items()} items, got {item_count}"}
+        )
+    
+    # Uploads are read and saved now; the form is closed once the stream starts
+    for file in files:
+        contents = await file.read()
+        if file.filename.lower().endswith('.pdf'):
+            await executors.run_io(parser_agent.save_upload, contents, file.filename)
+        items.append({"type": "pdf", "input": file.filename, "contents": contents})
+    for index, item in enumerate(items):
+        item['index'] = index
+    
+    logger.info("Processing batch of %s items", len(items))
+    return StreamingResponse(stream_batch(items, topics), media_type="application/x-ndjson")
+
+# Pipeline runners by job kind, for worker.py
+JOB_RUNNERS = {
+    "process_url": run_process_url,
+    "process_doi": run_process_doi,
+    "upload": run_upload_job,
+    "synthesize": run_synthesis
+}
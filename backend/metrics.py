@@ -0,0 +1,173 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from regex-speed metadata up to a slow BART run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Every metric in declaration order, rendered by /metrics
+_registry = []
+
+def escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metric:
+    """
+    Base for in-process metrics with Prometheus text rendering. Label values
+    are passed as keyword arguments and must match labelnames.
+    """
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {', '.join(self.labelnames) or 'none'}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, value in items:
+            lines.append(f"{self.name}{format_labels(self.labelnames, values)} {format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """
+    A value that goes up and down. With collect, the values are read at
+    scrape time instead: collect() returns {label values tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def set(self, value: float, **labels):
+        key = self.label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        if self.collect is not None:
+            try:
+                values = self.collect()
+            except Exception as e:
+                logger.warning("Collecting %s failed: %s", self.name, e)
+                values = {}
+            with self._lock:
+                self._values = {tuple(str(value) for value in key): value for key, value in values.items()}
+        return super().render()
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.label_values(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # One count per bucket interval plus the overflow above the last bound
+                series = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, dict(series, counts=list(series['counts']))) for key, series in self._values.items())
+        for values, series in items:
+            # Buckets are stored per interval and rendered cumulatively
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Metrics shared across modules. Values are per process: job queue workers
+# keep their own, and time spent in parser processes is measured by the
+# web process that awaits them.
+
+STAGE_SECONDS = Histogram(
+    "paperanalyzer_stage_seconds",
+    "Duration of each processing stage (fetch, parse, quality_check, classify, summarize, tts, metadata, citations, synthesis)",
+    ("pipeline", "stage")
+)
+STAGE_ERRORS = Counter(
+    "paperanalyzer_stage_errors_total",
+    "Stages that raised or timed out",
+    ("pipeline", "stage")
+)
+CACHE_REQUESTS = Counter(
+    "paperanalyzer_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, coalesced)",
+    ("cache", "result")
+)
+FALLBACKS = Counter(
+    "paperanalyzer_fallbacks_total",
+    "Degraded results served instead of the normal output",
+    ("kind",)
+)
+UPSTREAM_ERRORS = Counter(
+    "paperanalyzer_upstream_errors_total",
+    "Failed calls to external services",
+    ("upstream",)
+)
@@ -0,0 +1,100 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import Config
+
+# Stored papers by canonical ID, most recently stored or read last
+_papers = OrderedDict()
+# Every known identifier (arXiv ID with and without version, S2 paperId, DOI,
+# content hash) -> canonical ID. Titles are not identifiers: different papers
+# can share one, so papers without an external ID are keyed by a hash of
+# their source, title and abstract instead.
+_aliases = {}
+# Canonical ID -> aliases registered for it, so eviction can clean them up
+_paper_aliases = {}
+_lock = threading.Lock()
+
+def normalize_key(value: str) -> str:
+    return re.sub(r'\s+', ' ', str(value)).strip().lower()
+
+def content_hash(text: str) -> str:
+    """Stable ID for papers that have no external identifier"""
+    return "sha256:" + hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()
+
+def paper_identifiers(paper: Dict[str, Any]) -> List[str]:
+    """All identifiers a paper can be looked up by, canonical ID first"""
+    identifiers = []
+    arxiv_id = paper.get('arxiv_id')
+    if arxiv_id:
+        identifiers.append(arxiv_id)
+        identifiers.append(re.sub(r'v\d+$', '', arxiv_id))
+    if paper.get('paper_id'):
+        identifiers.append(paper['paper_id'])
+    if paper.get('doi'):
+        identifiers.append(paper['doi'])
+    if paper.get('content_hash'):
+        identifiers.append(paper['content_hash'])
+    if not identifiers:
+        identifiers.append(content_hash(f"{paper.get('source', '')}\n{paper.get('title', '')}\n{paper.get('summary', '')}"))
+    return [normalize_key(identifier) for identifier in identifiers]
+
+def store_paper(paper: Dict[str, Any]) -> str:
+    """Store a paper and return its canonical ID"""
+    identifiers = paper_identifiers(paper)
+    paper_id = identifiers[0]
+    with _lock:
+        _papers[paper_id] = paper
+        _papers.move_to_end(paper_id)
+        aliases = _paper_aliases.setdefault(paper_id, set())
+        for identifier in identifiers:
+            _aliases[identifier] = paper_id
+            aliases.add(identifier)
+        while len(_papers) > Config.get_paper_store_size():
+            evict_oldest()
+    return paper_id
+
+def store_papers(papers: List[Dict[str, Any]]) -> List[str]:
+    """Store a batch of papers and return their canonical IDs in order"""
+    return [store_paper(paper) for paper in papers]
+
+def evict_oldest():
+    """Drop the least recently used paper and its aliases; caller holds the lock"""
+    paper_id, _ = _papers.popitem(last=False)
+    for alias in _paper_aliases.pop(paper_id, ()):
+        if _aliases.get(alias) == paper_id:
+            del _aliases[alias]
+
+def get_paper(identifier: str) -> Optional[Dict[str, Any]]:
+    """Look up a paper by any of its identifiers"""
+    with _lock:
+        paper_id = _aliases.get(normalize_key(identifier))
+        if paper_id is None:
+            return None
+        _papers.move_to_end(paper_id)
+        return _papers[paper_id]
+
+def get_papers(identifiers: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Bulk lookup preserving the requested order. Returns the papers found
+    (each at most once) and the identifiers that are not in the store.
+    """
+    found = []
+    missing = []
+    seen = set()
+    with _lock:
+        for identifier in identifiers:
+            paper_id = _aliases.get(normalize_key(identifier))
+            if paper_id is None:
+                missing.append(identifier)
+                continue
+            if paper_id not in seen:
+                seen.add(paper_id)
+                _papers.move_to_end(paper_id)
+                found.append(_papers[paper_id])
+    return found, missing
+
+def paper_count() -> int:
+    return len(_papers)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class Stage:
+    """
+    One step of a pipeline. func is a coroutine function called with the
+    stage's inputs as keyword arguments; it returns the value of the single
+    output, or a dict with a value for each output when there are several.
+    cache_key, if given, maps the inputs to a key (or None to skip caching)
+    under which the outputs are stored in the pipeline's cache; cache_if can
+    veto storing particular outputs (e.g. error messages).
+    """
+    def __init__(self, name: str, func: Callable, inputs: List[str], outputs: List[str],
+                 timeout: Optional[float] = None, cache_key: Optional[Callable] = None,
+                 cache_if: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.timeout = timeout
+        self.cache_key = cache_key
+        self.cache_if = cache_if
+
+    def get_timeout(self) -> float:
+        return self.timeout if self.timeout is not None else Config.get_stage_timeout(self.name)
+
+class StageTimeout(Exception):
+    pass
+
+class StageCache:
+    """In-memory LRU of stage outputs, shared by every run of the pipelines that use it"""
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            outputs = self._entries.get(key)
+            if outputs is not None:
+                self._entries.move_to_end(key)
+            return outputs
+
+    def set(self, key: str, outputs: Dict[str, Any]):
+        max_entries = self.max_entries or Config.get_stage_cache_size()
+        with self._lock:
+            self._entries[key] = outputs
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+class Pipeline:
+    """
+    A DAG of stages wired by the names of their inputs and outputs. run()
+    starts every stage as soon as all of its inputs exist, so independent
+    stages run concurrently and latency follows the critical path. The
+    first failing stage cancels the rest and its exception is raised.
+    """
+    def __init__(self, name: str, stages: List[Stage], cache: Optional[StageCache] = None):
+        self.name = name
+        self.stages = stages
+        self.cache = cache
+        self.check()
+
+    def check(self):
+        """Every output is produced once and no stage depends on its own results"""
+        producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{self.name}: {output} is produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        for stage in self.stages:
+            seen = set()
+            pending = [producers[name] for name in stage.inputs if name in producers]
+            while pending:
+                upstream = pending.pop()
+                if upstream == stage.name:
+                    raise ValueError(f"{self.name}: stage {stage.name} depends on itself")
+                if upstream not in seen:
+                    seen.add(upstream)
+                    upstream_stage = next(s for s in self.stages if s.name == upstream)
+                    pending.extend(producers[name] for name in upstream_stage.inputs if name in producers)
+
+    async def run(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Run all stages on the given inputs and return every value, inputs included"""
+        values = dict(values)
+        timings = {}
+        waiting = list(self.stages)
+        running = {}
+        started = time.perf_counter()
+        try:
+            while waiting or running:
+                for stage in [stage for stage in waiting if all(name in values for name in stage.inputs)]:
+                    waiting.remove(stage)
+                    running[asyncio.ensure_future(self.run_stage(stage, values, timings))] = stage
+                if not running:
+                    missing = {name for stage in waiting for name in stage.inputs if name not in values}
+                    raise ValueError(f"{self.name}: no stage produces {', '.join(sorted(missing))}")
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    values.update(task.result())
+        finally:
+            for task in running:
+                task.cancel()
+        total = time.perf_counter() - started
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Pipeline %s finished in %.2fs: %s", self.name, total,
+                        ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+        values['stage_timings'] = timings
+        return values
+
+    async def run_stage(self, stage: Stage, values: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+        inputs = {name: values[name] for name in stage.inputs}
+        key = stage.cache_key(inputs) if self.cache and stage.cache_key else None
+        if key is not None:
+            cached = self.cache.get(f"{stage.name}:{key}")
+            metrics.CACHE_REQUESTS.inc(cache="stage", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                timings[stage.name] = 0.0
+                return cached
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage.func(**inputs), timeout=stage.get_timeout())
+        except asyncio.TimeoutError:
+            metrics.STAGE_ERRORS.inc(pipeline=self.name, stage=stage.name)
+            raise StageTimeout(f"Stage {stage.name} timed out after {stage.get_timeout():g}s")
+        except Exception:
+            metrics.STAGE_ERRORS.inc(pipeline=self.name, stage=stage.name)
+            raise
+        finally:
+            timings[stage.name] = time.perf_counter() - started
+            metrics.STAGE_SECONDS.observe(timings[stage.name], pipeline=self.name, stage=stage.name)
+
+        outputs = result if len(stage.outputs) > 1 else {stage.outputs[0]: result}
+        if key is not None and (stage.cache_if is None or stage.cache_if(outputs)):
+            self.cache.set(f"{stage.name}:{key}", outputs)
+        return outputs
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads that are waiting for work rather than doing it
+# (idle pool threads, the event loop in select, condition waits)
+IDLE_FRAMES = {
+    ('thread.py', '_worker'),
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('queues.py', 'get'),
+}
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 30
+
+# tracemalloc and the sampler see the whole process, so one profile at a time
+_active = threading.Lock()
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of every thread in the process at a fixed
+    interval from a background thread and counts them in folded form
+    ("thread;outer;...;inner"), the input format of flamegraph.pl and
+    speedscope. Work in parser processes is not visible here; it shows up as
+    the awaiting thread waiting.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+class ProfileSession:
+    """One profiled request: a sampling profile plus a tracemalloc snapshot"""
+    def __init__(self, description: str):
+        self.profile_id = uuid.uuid4().hex
+        self.description = description
+        self.profiler = SamplingProfiler(Config.get_profile_interval())
+        self.started_tracing = False
+        self.started = 0.0
+        self.stopped = False
+
+    def start(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.profiler.start()
+
+    def stop(self):
+        """
+        Stop sampling and record the request's duration and memory use. Only
+        reads counters, so it is safe on the event loop and a cancelled
+        request cannot skip it; idempotent. The snapshot is left to write().
+        """
+        if self.stopped:
+            return
+        self.stopped = True
+        self.profiler.stop()
+        self.elapsed = time.perf_counter() - self.started
+        self.traced, self.peak = tracemalloc.get_traced_memory()
+
+    def release(self):
+        """Snapshot the traced memory, stop tracing and let the next profile start"""
+        try:
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if self.started_tracing:
+                tracemalloc.stop()
+            _active.release()
+        return snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+
+    def write(self) -> Optional[Dict[str, Any]]:
+        """
+        Snapshot memory, release the profiler and write <id>.folded and <id>.json
+        to the profile directory. Walks every traced block, so run it off the
+        event loop after stop().
+        """
+        try:
+            snapshot = self.release()
+            profile_dir = Config.get_profile_dir()
+            os.makedirs(profile_dir, exist_ok=True)
+            with open(os.path.join(profile_dir, f"{self.profile_id}.folded"), 'w') as f:
+                for stack, count in self.profiler.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            summary = {
+                'profile_id': self.profile_id,
+                'request': self.description,
+                'created_at': datetime.now().isoformat(),
+                'duration_seconds': self.elapsed,
+                'sample_interval_seconds': self.profiler.interval,
+                'samples': self.profiler.sample_count,
+                'traced_memory_bytes': self.traced,
+                'peak_traced_memory_bytes': self.peak,
+                # Memory still held when the request finished, by allocating line
+                'retained_allocations': [
+                    {
+                        'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        'size_bytes': stat.size,
+                        'count': stat.count
+                    }
+                    for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+                ]
+            }
+            with open(os.path.join(profile_dir, f"{self.profile_id}.json"), 'w') as f:
+                json.dump(summary, f, indent=1)
+        except Exception as e:
+            logger.error("Writing profile %s failed: %s", self.profile_id, e)
+            return None
+        logger.info("Profile %s written for %s (%.2fs, %s samples)",
+                    self.profile_id, self.description, self.elapsed, self.profiler.sample_count)
+        return summary
+
+def start_session(description: str) -> Optional[ProfileSession]:
+    """Start profiling, or return None if another profile is already running"""
+    if not _active.acquire(blocking=False):
+        return None
+    try:
+        session = ProfileSession(description)
+        session.start()
+    except Exception:
+        _active.release()
+        raise
+    return session
+
+def profile_path(profile_id: str, extension: str) -> Optional[str]:
+    """Path of a written profile file, or None for unknown or malformed IDs"""
+    if not (len(profile_id) == 32 and all(c in "0123456789abcdef" for c in profile_id)):
+        return None
+    path = os.path.join(Config.get_profile_dir(), f"{profile_id}.{extension}")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,143 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import metrics
+from config import Config
+from agents import search_agent
+
+logger = logging.getLogger(__name__)
+
+# Whole responses of the paper endpoints by normalized request, least
+# recently used first: key -> {'response', 'expires_at'}
+_entries = OrderedDict()
+_lock = threading.Lock()
+# Computations in progress by key, so identical concurrent requests share one
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Query parameters that never change the document a URL points to
+TRACKING_PARAMETERS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+def normalize_topics(topics: str) -> str:
+    """Topic lists that differ only in order, case or spacing share a key"""
+    return ",".join(sorted({topic.strip().lower() for topic in topics.split(",") if topic.strip()}))
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a paper URL: arXiv and Semantic Scholar URLs reduce to
+    their paper ID; otherwise the host is lowercased and fragments, tracking
+    parameters and trailing slashes are dropped.
+    """
+    known = search_agent.match_known_url(url)
+    if known:
+        return f"{known[0]}:{known[1]}"
+    parts = urlsplit(url.strip())
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not name.lower().startswith(TRACKING_PARAMETERS)]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+def doi_key(doi: str, topics: str) -> str:
+    return f"doi:{search_agent.normalize_doi(doi)}|{normalize_topics(topics)}"
+
+def url_key(url: str, topics: str) -> str:
+    return f"url:{normalize_url(url)}|{normalize_topics(topics)}"
+
+def pdf_key(contents: bytes, topics: str) -> str:
+    return f"pdf:{hashlib.sha256(contents).hexdigest()}|{normalize_topics(topics)}"
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] < time.time():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return copy.deepcopy(entry['response'])
+
+def put(key: str, response: Dict[str, Any]):
+    ttl = Config.get_response_cache_ttl()
+    if ttl <= 0:
+        return
+    with _lock:
+        _entries[key] = {'response': copy.deepcopy(response), 'expires_at': time.time() + ttl}
+        _entries.move_to_end(key)
+        while len(_entries) > Config.get_response_cache_size():
+            _entries.popitem(last=False)
+
+def invalidate(key: str) -> bool:
+    with _lock:
+        return _entries.pop(key, None) is not None
+
+def invalidate_matching(prefix: str) -> int:
+    """Drop every entry whose key starts with prefix (e.g. all topic sets for one DOI)"""
+    with _lock:
+        keys = [key for key in _entries if key.startswith(prefix)]
+        for key in keys:
+            del _entries[key]
+        return len(keys)
+
+def clear() -> int:
+    with _lock:
+        count = len(_entries)
+        _entries.clear()
+        return count
+
+async def get_or_compute(key: str, compute: Callable[[], Awaitable[Dict[str, Any]]],
+                         cacheable: Callable[[Dict[str, Any]], bool] = lambda response: True) -> Dict[str, Any]:
+    """
+    Cached response for key, or the result of compute(). While a computation
+    for key is running, identical requests await it instead of starting their
+    own. Failures are not cached, and every waiter sees the same exception.
+    """
+    cached = get(key)
+    if cached is not None:
+        logger.debug("Response cache hit: %s", key)
+        metrics.CACHE_REQUESTS.inc(cache="response", result="hit")
+        return cached
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        logger.debug("Joining in-flight computation: %s", key)
+        metrics.CACHE_REQUESTS.inc(cache="response", result="coalesced")
+        try:
+            # shield: one waiter disconnecting must not cancel the shared work
+            return copy.deepcopy(await asyncio.shield(inflight))
+        except asyncio.CancelledError:
+            if inflight.cancelled():
+                # The request doing the work was cancelled; start over
+                return await get_or_compute(key, compute, cacheable)
+            raise
+
+    metrics.CACHE_REQUESTS.inc(cache="response", result="miss")
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        response = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved when nobody else was waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(response)
+        if cacheable(response):
+            put(key, response)
+        return copy.deepcopy(response)
+    finally:
+        _inflight.pop(key, None)
+
+def cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {'entries': len(_entries), 'in_flight': len(_inflight)}
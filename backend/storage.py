@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = "data"
+
+# Files under DATA_DIR by relative path, least recently accessed first:
+# path -> {'size', 'kind', 'last_access'}
+_inventory = OrderedDict()
+# Running totals so stats and quota checks never walk the directory
+_totals = {'bytes': 0, 'files': 0}
+_kind_counts = {}
+_loaded = False
+_lock = threading.Lock()
+
+def file_kind(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.mp3':
+        return 'audio'
+    if extension == '.pdf':
+        return 'pdf'
+    return 'other'
+
+def shard_path(filename: str, kind: str) -> str:
+    """
+    Relative path for a new file in the sharded layout, e.g.
+    audio/3f/audio_3f9c....mp3. The shard is taken from a hash of the
+    name so no single directory grows without bound.
+    """
+    shard = hashlib.sha1(filename.encode('utf-8')).hexdigest()[:2]
+    return os.path.join(kind, shard, filename)
+
+def prepare_path(relative_path: str) -> str:
+    """Create the shard directory for a relative path and return the absolute path"""
+    absolute_path = os.path.join(DATA_DIR, relative_path)
+    os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+    return absolute_path
+
+def load_inventory():
+    """Scan DATA_DIR once to seed the inventory; later updates are incremental"""
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        entries = []
+        for root, _, files in os.walk(DATA_DIR):
+            for name in files:
+                absolute_path = os.path.join(root, name)
+                relative_path = os.path.relpath(absolute_path, DATA_DIR)
+                if not is_managed(relative_path):
+                    continue
+                try:
+                    stat = os.stat(absolute_path)
+                except OSError:
+                    continue
+                # atime may not be updated (noatime mounts), so never trust it below mtime
+                entries.append((max(stat.st_atime, stat.st_mtime), relative_path, stat.st_size))
+        for last_access, relative_path, size in sorted(entries):
+            add_entry(relative_path, size, last_access)
+        _loaded = True
+    logger.info("Storage inventory loaded: %s files, %s bytes", _totals['files'], _totals['bytes'])
+
+def is_managed(relative_path: str) -> bool:
+    """
+    Files the manager may evict: everything in the sharded audio/ and
+    uploads/ trees plus legacy flat audio_*.mp3 files. Bookkeeping files
+    (manifests, partial writes) and bundled data are never touched.
+    """
+    if relative_path.endswith(('.json', '.part', '.tmp')):
+        return False
+    top = relative_path.split(os.sep, 1)[0]
+    if top in ('audio', 'uploads') and os.sep in relative_path:
+        return True
+    return os.sep not in relative_path and top.startswith('audio_') and top.endswith('.mp3')
+
+def add_entry(relative_path: str, size: int, last_access: float):
+    """Caller holds the lock"""
+    if relative_path in _inventory:
+        remove_entry(relative_path)
+    kind = file_kind(relative_path)
+    _inventory[relative_path] = {'size': size, 'kind': kind, 'last_access': last_access}
+    _totals['bytes'] += size
+    _totals['files'] += 1
+    _kind_counts[kind] = _kind_counts.get(kind, 0) + 1
+
+def remove_entry(relative_path: str):
+    """Caller holds the lock"""
+    entry = _inventory.pop(relative_path, None)
+    if entry is None:
+        return None
+    _totals['bytes'] -= entry['size']
+    _totals['files'] -= 1
+    _kind_counts[entry['kind']] -= 1
+    return entry
+
+def record_write(relative_path: str):
+    """Register a newly written file, then enforce the TTL and the size quota"""
+    load_inventory()
+    size = os.path.getsize(os.path.join(DATA_DIR, relative_path))
+    with _lock:
+        add_entry(relative_path, size, time.time())
+        evicted = evict_locked(protect=relative_path)
+    delete_files(evicted)
+
+def touch(relative_path: str):
+    """Mark a file as just used so LRU eviction keeps it"""
+    with _lock:
+        entry = _inventory.get(relative_path)
+        if entry is not None:
+            entry['last_access'] = time.time()
+            _inventory.move_to_end(relative_path)
+
+def evict_locked(protect: str = "") -> list:
+    """
+    Pop expired files, then least recently used files until under quota.
+    The inventory is ordered by last access, so both only look at the front.
+    Caller holds the lock; returns the paths to delete.
+    """
+    evicted = []
+    expires_before = time.time() - Config.get_storage_ttl_seconds()
+    quota = Config.get_storage_quota_bytes()
+    while _inventory:
+        relative_path, entry = next(iter(_inventory.items()))
+        if relative_path == protect:
+            break
+        if entry['last_access'] >= expires_before and _totals['bytes'] <= quota:
+            break
+        remove_entry(relative_path)
+        evicted.append(relative_path)
+    return evicted
+
+def evict():
+    """Run TTL and quota eviction now; main.py calls this periodically"""
+    load_inventory()
+    with _lock:
+        evicted = evict_locked()
+    delete_files(evicted)
+
+def delete_files(relative_paths: list):
+    for relative_path in relative_paths:
+        try:
+            os.remove(os.path.join(DATA_DIR, relative_path))
+            logger.info("Evicted %s", relative_path)
+        except OSError as e:
+            logger.error("Error evicting %s: %s", relative_path, e)
+
+def inventory_stats() -> Dict[str, Any]:
+    """Constant-time storage summary"""
+    load_inventory()
+    with _lock:
+        return {
+            'files': _totals['files'],
+            'bytes': _totals['bytes'],
+            'audio_files': _kind_counts.get('audio', 0),
+            'pdf_files': _kind_counts.get('pdf', 0),
+            'quota_bytes': Config.get_storage_quota_bytes()
+        }
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite job queue: exclusive claims, lease expiry, retries
+with backoff and result expiry, each against a fresh database file
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import job_queue
+
+@contextmanager
+def temp_queue(**settings):
+    """A fresh queue database with the given environment settings"""
+    saved = {name: os.environ.get(name) for name in ['JOB_QUEUE_PATH', *settings]}
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['JOB_QUEUE_PATH'] = os.path.join(directory, "jobs.sqlite3")
+        os.environ.update({name: str(value) for name, value in settings.items()})
+        try:
+            yield
+        finally:
+            job_queue.close_connection()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+def test_concurrent_claims_are_exclusive():
+    with temp_queue():
+        job_ids = {job_queue.enqueue("process_url", {'index': index}) for index in range(40)}
+        claimed = []
+        claimed_lock = threading.Lock()
+
+        def claim_all(worker: str):
+            # One connection per thread, as each worker process has its own
+            try:
+                while True:
+                    job = job_queue.claim(worker)
+                    if job is None:
+                        return
+                    with claimed_lock:
+                        claimed.append(job['job_id'])
+            finally:
+                job_queue.close_connection()
+
+        threads = [threading.Thread(target=claim_all, args=(f"worker-{n}",)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(claimed) == sorted(job_ids)
+        assert job_queue.queue_depth() == 40
+        assert all(job_queue.get_job(job_id)['status'] == 'running' for job_id in job_ids)
+
+def test_expired_lease_is_claimed_again_until_attempts_run_out():
+    with temp_queue(JOB_LEASE_SECONDS=0, JOB_MAX_ATTEMPTS=2):
+        job_id = job_queue.enqueue("upload", {})
+        first = job_queue.claim("worker-1")
+        assert first['job_id'] == job_id and first['attempts'] == 1
+        time.sleep(0.01)
+
+        # The first worker "died": its lease has expired
+        second = job_queue.claim("worker-2")
+        assert second['job_id'] == job_id and second['attempts'] == 2
+        time.sleep(0.01)
+
+        assert job_queue.claim("worker-3") is None
+        job = job_queue.get_job(job_id)
+        assert job['status'] == 'failed'
+        assert job['error'] == "Worker stopped while running the job"
+
+def test_renewed_lease_is_not_claimed_again():
+    with temp_queue(JOB_LEASE_SECONDS=1):
+        job_id = job_queue.enqueue("process_url", {})
+        job_queue.claim("worker-1")
+        time.sleep(1.1)
+        # A heartbeat before the lease runs out keeps the job with its worker
+        assert job_queue.renew_lease(job_id, "worker-1")
+        assert job_queue.claim("worker-2") is None
+        assert not job_queue.renew_lease(job_id, "worker-2")
+
+        job_queue.complete(job_id, {})
+        assert not job_queue.renew_lease(job_id, "worker-1")
+
+def test_queue_depth_does_not_create_the_database():
+    with temp_queue():
+        path = os.environ['JOB_QUEUE_PATH']
+        assert job_queue.queue_depth() == 0
+        assert not os.path.exists(path)
+
+def test_failed_attempt_is_retried_after_backoff():
+    with temp_queue(JOB_MAX_ATTEMPTS=2):
+        job_id = job_queue.enqueue("process_doi", {'doi': "10.1/x"})
+        job_queue.claim("worker-1")
+        job_queue.fail(job_id, "upstream timed out")
+
+        job = job_queue.get_job(job_id)
+        assert job['status'] == 'queued' and job['error'] == "upstream timed out"
+        # Not runnable until the backoff delay has passed
+        assert job_queue.claim("worker-1") is None
+
+        saved_delay = job_queue.RETRY_DELAY
+        job_queue.RETRY_DELAY = 0
+        try:
+            job_queue.fail(job_id, "upstream timed out")
+        finally:
+            job_queue.RETRY_DELAY = saved_delay
+        retry = job_queue.claim("worker-2")
+        assert retry['job_id'] == job_id and retry['attempts'] == 2
+
+        # The last attempt fails for good
+        job_queue.fail(job_id, "upstream timed out again")
+        job = job_queue.get_job(job_id)
+        assert job['status'] == 'failed' and job['error'] == "upstream timed out again"
+        assert job_queue.queue_depth() == 0
+
+def test_failure_without_retry_is_final():
+    with temp_queue(JOB_MAX_ATTEMPTS=3):
+        job_id = job_queue.enqueue("upload", {})
+        job_queue.claim("worker-1")
+        job_queue.fail(job_id, "Not a PDF", result={'error': "Not a PDF"}, retry=False)
+        job = job_queue.get_job(job_id)
+        assert job['status'] == 'failed' and job['result'] == {'error': "Not a PDF"}
+
+def test_finished_results_expire():
+    with temp_queue(JOB_RESULT_TTL=0):
+        job_id = job_queue.enqueue("synthesize", {})
+        job_queue.claim("worker-1")
+        job_queue.complete(job_id, {'synthesis': "..."}, {'papers': []})
+        time.sleep(0.01)
+
+        assert job_queue.get_job(job_id) is None
+        assert job_queue.purge_expired() == 1
+
+if __name__ == "__main__":
+    test_concurrent_claims_are_exclusive()
+    test_expired_lease_is_claimed_again_until_attempts_run_out()
+    test_renewed_lease_is_not_claimed_again()
+    test_queue_depth_does_not_create_the_database()
+    test_failed_attempt_is_retried_after_backoff()
+    test_failure_without_retry_is_final()
+    test_finished_results_expire()
+    print("✓ Job queue tests passed")
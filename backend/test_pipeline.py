@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline DAG: concurrent independent stages, stage
+timeouts, failure cancellation, dependency checks and the stage cache
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import Pipeline, Stage, StageCache, StageTimeout
+
+async def double(x: int) -> int:
+    return x * 2
+
+def test_independent_stages_run_concurrently():
+    async def slow_left(value: int) -> int:
+        await asyncio.sleep(0.1)
+        return value + 1
+
+    async def slow_right(value: int) -> int:
+        await asyncio.sleep(0.1)
+        return value - 1
+
+    async def combine(left: int, right: int) -> int:
+        return left * right
+
+    pipeline = Pipeline("test", [
+        Stage("combine", combine, ["left", "right"], ["product"]),
+        Stage("left", slow_left, ["value"], ["left"]),
+        Stage("right", slow_right, ["value"], ["right"]),
+    ])
+    started = time.perf_counter()
+    values = asyncio.run(pipeline.run({'value': 5}))
+    elapsed = time.perf_counter() - started
+
+    assert values['product'] == 24
+    assert elapsed < 0.18
+    assert set(values['stage_timings']) == {"left", "right", "combine"}
+
+def test_stage_timeout_raises_and_cancels_other_stages():
+    cancelled = []
+
+    async def hang(value: int) -> int:
+        await asyncio.sleep(10)
+        return value
+
+    async def long_running(value: int) -> int:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("long_running")
+            raise
+        return value
+
+    pipeline = Pipeline("test", [
+        Stage("hang", hang, ["value"], ["hung"], timeout=0.05),
+        Stage("long_running", long_running, ["value"], ["other"], timeout=30),
+    ])
+
+    async def run():
+        try:
+            await pipeline.run({'value': 1})
+        except StageTimeout as e:
+            # Let the cancelled stage observe its cancellation
+            await asyncio.sleep(0)
+            return e
+        return None
+
+    started = time.perf_counter()
+    error = asyncio.run(run())
+    assert isinstance(error, StageTimeout)
+    assert "hang" in str(error)
+    assert time.perf_counter() - started < 1
+    assert cancelled == ["long_running"]
+
+def test_stage_timeout_defaults_to_config():
+    os.environ['STAGE_TIMEOUT_HANG'] = "0.05"
+    try:
+        async def hang(value: int) -> int:
+            await asyncio.sleep(10)
+
+        pipeline = Pipeline("test", [Stage("hang", hang, ["value"], ["hung"])])
+        try:
+            asyncio.run(pipeline.run({'value': 1}))
+        except StageTimeout:
+            pass
+        else:
+            raise AssertionError("StageTimeout not raised")
+    finally:
+        del os.environ['STAGE_TIMEOUT_HANG']
+
+def test_dependency_errors_are_found_up_front():
+    for stages in (
+        [Stage("a", double, ["x"], ["y"]), Stage("b", double, ["y"], ["x"])],
+        [Stage("a", double, ["x"], ["y"]), Stage("b", double, ["x"], ["y"])],
+    ):
+        try:
+            Pipeline("test", stages)
+        except ValueError:
+            continue
+        raise AssertionError("invalid pipeline accepted")
+
+    pipeline = Pipeline("test", [Stage("a", double, ["missing"], ["y"])])
+    try:
+        asyncio.run(pipeline.run({'x': 1}))
+    except ValueError as e:
+        assert "missing" in str(e)
+    else:
+        raise AssertionError("missing input not reported")
+
+def test_stage_cache_skips_repeated_work():
+    calls = []
+
+    async def counted(x: int) -> int:
+        calls.append(x)
+        return x * 2
+
+    pipeline = Pipeline("test", [
+        Stage("counted", counted, ["x"], ["y"], cache_key=lambda inputs: str(inputs['x']),
+              cache_if=lambda outputs: outputs['y'] != 0)
+    ], cache=StageCache(max_entries=10))
+
+    assert asyncio.run(pipeline.run({'x': 3}))['y'] == 6
+    assert asyncio.run(pipeline.run({'x': 3}))['y'] == 6
+    assert calls == [3]
+
+    # cache_if vetoes storing this output
+    asyncio.run(pipeline.run({'x': 0}))
+    asyncio.run(pipeline.run({'x': 0}))
+    assert calls == [3, 0, 0]
+
+if __name__ == "__main__":
+    test_independent_stages_run_concurrently()
+    test_stage_timeout_raises_and_cancels_other_stages()
+    test_stage_timeout_defaults_to_config()
+    test_dependency_errors_are_found_up_front()
+    test_stage_cache_skips_repeated_work()
+    print("✓ Pipeline tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the response cache's single-flight behaviour: identical
+concurrent requests share one computation, and failures are shared but
+never cached
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import response_cache
+
+def test_concurrent_identical_requests_compute_once():
+    response_cache.clear()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'summary': "shared", 'topics': ["ml"]}
+
+    async def run():
+        return await asyncio.gather(*(response_cache.get_or_compute("doi:10.1/a|ml", compute) for _ in range(20)))
+
+    responses = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(response == {'summary': "shared", 'topics': ["ml"]} for response in responses)
+    # Every caller gets its own copy
+    responses[0]['topics'].append("changed")
+    assert responses[1]['topics'] == ["ml"]
+
+    # Later requests are served from the cache
+    assert asyncio.run(response_cache.get_or_compute("doi:10.1/a|ml", compute))['summary'] == "shared"
+    assert len(calls) == 1
+    assert response_cache.cache_stats() == {'entries': 1, 'in_flight': 0}
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    response_cache.clear()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(response_cache.get_or_compute("url:x|ml", compute) for _ in range(5)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) and str(result) == "upstream down" for result in results)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert response_cache.cache_stats() == {'entries': 0, 'in_flight': 0}
+
+def test_uncacheable_response_is_shared_but_not_stored():
+    response_cache.clear()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'error': "Could not fetch the paper"}
+
+    async def run():
+        return await asyncio.gather(*(
+            response_cache.get_or_compute("url:y|ml", compute, cacheable=lambda response: 'error' not in response)
+            for _ in range(3)
+        ))
+
+    assert len(asyncio.run(run())) == 3
+    assert len(calls) == 1
+    assert response_cache.get("url:y|ml") is None
+
+if __name__ == "__main__":
+    test_concurrent_identical_requests_compute_once()
+    test_failure_reaches_every_waiter_and_is_not_cached()
+    test_uncacheable_response_is_shared_but_not_stored()
+    print("✓ Response cache tests passed")
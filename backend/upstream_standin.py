@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the upstream services the agents call: the arXiv API,
+the Semantic Scholar Graph API, the DOI resolver and gTTS.
+
+Modes:
+  record  forward every request to the real service and save the response as a fixture
+  replay  answer from saved fixtures, falling back to synthetic responses for unseen requests
+
+Both modes can inject latency and errors. Point the backend at it with
+UPSTREAM_STANDIN_URL=http://127.0.0.1:8765 (see Config.get_upstream_url).
+
+Usage:
+  python upstream_standin.py --mode record --port 8765
+  python upstream_standin.py --mode replay --latency-ms 150 --jitter-ms 50 --error-rate 0.02
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Service prefix (as used by Config.get_upstream_url) -> real upstream base URL
+UPSTREAM_SERVICES = {
+    'arxiv_api': 'http://export.arxiv.org/api/query',
+    'semantic_scholar_api': 'https://api.semanticscholar.org/graph/v1',
+    'doi_resolver': 'https://doi.org',
+    'tts_service': None,  # answered with gTTS, not forwarded
+}
+
+# Request headers that change the upstream response and so belong in the fixture key
+KEY_HEADERS = ('Accept',)
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, no padding: 417 bytes and ~26 ms per frame
+SILENT_MP3_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+SILENT_MP3_FRAME_SECONDS = 1152 / 44100
+SPOKEN_CHARS_PER_SECOND = 15
+
+def fixture_key(service: str, method: str, path: str, query: str, headers: dict, body: bytes) -> str:
+    """Stable key for a request: same request, same fixture"""
+    parts = [
+        service,
+        method,
+        path,
+        urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(query, keep_blank_values=True))),
+    ]
+    parts.extend(f"{name}={headers.get(name, '')}" for name in KEY_HEADERS)
+    parts.append(hashlib.sha256(body).hexdigest())
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+def fixture_path(fixtures_dir: str, service: str, key: str) -> str:
+    return os.path.join(fixtures_dir, service, f"{key}.json")
+
+def save_fixture(fixtures_dir: str, service: str, key: str, request_info: dict, status: int, content_type: str, body: bytes):
+    path = fixture_path(fixtures_dir, service, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fixture = {
+        'request': request_info,
+        'status': status,
+        'content_type': content_type,
+        'body': base64.b64encode(body).decode('ascii'),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    with open(path, 'w') as f:
+        json.dump(fixture, f, indent=2)
+
+def load_fixture(fixtures_dir: str, service: str, key: str):
+    path = fixture_path(fixtures_dir, service, key)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        fixture = json.load(f)
+    return fixture['status'], fixture['content_type'], base64.b64decode(fixture['body'])
+
+def forward_upstream(service: str, method: str, path: str, query: str, headers: dict, body: bytes) -> tuple:
+    """Send the request to the real service and return (status, content type, body)"""
+    if service == 'tts_service':
+        return synthesize_with_gtts(body)
+
+    url = UPSTREAM_SERVICES[service] + path
+    if query:
+        url += '?' + query
+    forwarded = {name: headers[name] for name in KEY_HEADERS if headers.get(name)}
+    forwarded['User-Agent'] = 'Research-Synthesis-App/1.0'
+    request = urllib.request.Request(url, data=body or None, headers=forwarded, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.headers.get('Content-Type', ''), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('Content-Type', ''), e.read()
+
+def synthesize_with_gtts(body: bytes) -> tuple:
+    from gtts import gTTS
+    params = json.loads(body or b'{}')
+    buffer = io.BytesIO()
+    gTTS(text=params.get('text', ''), lang=params.get('lang', 'en'), slow=params.get('slow', False)).write_to_fp(buffer)
+    return 200, 'audio/mpeg', buffer.getvalue()
+
+def synthetic_response(service: str, path: str, query: str, headers: dict, body: bytes) -> tuple:
+    """Plausible response for a request that was never recorded"""
+    params = dict(urllib.parse.parse_qsl(query))
+
+    if service == 'arxiv_api':
+        start = int(params.get('start', 0))
+        count = min(int(params.get('max_results', 10)), 100)
+        entries = []
+        for i in range(start, start + count):
+            entries.append(
+                '<entry>'
+                f'<id>http://arxiv.org/abs/2301.{i:05d}v1</id>'
+                '<published>2023-01-15T00:00:00Z</published>'
+                f'<title>Synthetic arXiv Paper {i}</title>'
+                '<summary>This study investigates machine learning models. The results show that '
+                'deep learning improves accuracy and performance on benchmark data.</summary>'
+                '<author><name>Synthetic Author</name></author>'
+                '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>'
+                '</entry>'
+            )
+        feed = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f'<opensearch:totalResults>{start + count}</opensearch:totalResults>'
+            + ''.join(entries) + '</feed>'
+        )
+        return 200, 'application/atom+xml', feed.encode('utf-8')
+
+    if service == 'semantic_scholar_api':
+        offset = int(params.get('offset', 0))
+        limit = min(int(params.get('limit', 10)), 100)
+        data = [{
+            'paperId': f"synthetic{i:08d}",
+            'title': f"Synthetic Semantic Scholar Paper {i}",
+            'authors': [{'name': 'Synthetic Author'}],
+            'abstract': 'This research explores neural networks. We find that optimization of the model improves accuracy.',
+            'year': 2023,
+            'venue': 'Synthetic Venue',
+            'url': f"https://www.semanticscholar.org/paper/synthetic{i:08d}"
+        } for i in range(offset, offset + limit)]
+        payload = {'total': offset + limit, 'offset': offset, 'data': data}
+        return 200, 'application/json', json.dumps(payload).encode('utf-8')
+
+    if service == 'doi_resolver':
+        doi = urllib.parse.unquote(path.lstrip('/'))
+        if 'csl+json' in headers.get('Accept', ''):
+            csl = {
+                'DOI': doi,
+                'title': f"Synthetic Paper for {doi}",
+                'author': [{'given': 'Synthetic', 'family': 'Author'}],
+                'issued': {'date-parts': [[2023]]},
+                'container-title': 'Journal of Synthetic Results',
+                'abstract': '<jats:p>' + 'This paper presents a synthetic study of machine learning performance. ' * 6 + '</jats:p>'
+            }
+            return 200, 'application/vnd.citationstyles.csl+json', json.dumps(csl).encode('utf-8')
+        html = (
+            f"<html><head><title>Synthetic Paper for {doi}</title>"
+            '<meta name="citation_author" content="Synthetic Author">'
+            '<meta name="citation_journal_title" content="Journal of Synthetic Results"></head>'
+            '<body><h1>Synthetic Paper</h1><p>'
+            + 'This paper presents a synthetic study of machine learning performance and accuracy. ' * 20
+            + '</p></body></html>'
+        )
+        return 200, 'text/html; charset=utf-8', html.encode('utf-8')
+
+    if service == 'tts_service':
+        text = json.loads(body or b'{}').get('text', '')
+        seconds = max(len(text) / SPOKEN_CHARS_PER_SECOND, 1)
+        frames = int(seconds / SILENT_MP3_FRAME_SECONDS)
+        return 200, 'audio/mpeg', SILENT_MP3_FRAME * frames
+
+    return 404, 'application/json', b'{"error": "unknown service"}'
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "UpstreamStandin/1.0"
+
+    def do_GET(self):
+        self.handle_upstream_request()
+
+    def do_POST(self):
+        self.handle_upstream_request()
+
+    def handle_upstream_request(self):
+        settings = self.server.settings
+        parsed = urllib.parse.urlsplit(self.path)
+        service, _, rest = parsed.path.lstrip('/').partition('/')
+        if service not in UPSTREAM_SERVICES:
+            self.send_body(404, 'application/json', b'{"error": "unknown service"}')
+            return
+        path = '/' + rest if rest else ''
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        headers = {name: self.headers.get(name, '') for name in KEY_HEADERS}
+
+        delay = settings['latency_ms'].get(service, settings['default_latency_ms'])
+        delay += random.uniform(0, settings['jitter_ms'])
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        error_rate = settings['error_rate'].get(service, settings['default_error_rate'])
+        if random.random() < error_rate:
+            self.send_body(503, 'application/json', b'{"error": "injected upstream failure"}', {'Retry-After': '1'})
+            return
+
+        key = fixture_key(service, self.command, path, parsed.query, headers, body)
+        if settings['mode'] == 'record':
+            status, content_type, response_body = forward_upstream(service, self.command, path, parsed.query, headers, body)
+            request_info = {'method': self.command, 'path': path, 'query': parsed.query, 'headers': headers}
+            save_fixture(settings['fixtures_dir'], service, key, request_info, status, content_type, response_body)
+            source = 'recorded'
+        else:
+            fixture = load_fixture(settings['fixtures_dir'], service, key)
+            if fixture is not None:
+                status, content_type, response_body = fixture
+                source = 'fixture'
+            else:
+                status, content_type, response_body = synthetic_response(service, path, parsed.query, headers, body)
+                source = 'synthetic'
+
+        self.send_body(status, content_type, response_body, {'X-Standin-Source': source})
+
+    def send_body(self, status: int, content_type: str, body: bytes, extra_headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.settings['quiet']:
+            super().log_message(format, *args)
+
+def parse_service_values(values: list, cast) -> dict:
+    """Parse repeated service=value options"""
+    result = {}
+    for value in values or []:
+        service, _, amount = value.partition('=')
+        if service not in UPSTREAM_SERVICES:
+            raise SystemExit(f"Unknown service '{service}', expected one of {', '.join(UPSTREAM_SERVICES)}")
+        result[service] = cast(amount)
+    return result
+
+def create_server(host: str = '127.0.0.1', port: int = 8765, mode: str = 'replay',
+                  fixtures_dir: str = 'fixtures/upstream', latency_ms: float = 0,
+                  jitter_ms: float = 0, error_rate: float = 0,
+                  service_latency_ms: dict = None, service_error_rate: dict = None,
+                  quiet: bool = False) -> ThreadingHTTPServer:
+    """Create (but do not start) a stand-in server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.settings = {
+        'mode': mode,
+        'fixtures_dir': fixtures_dir,
+        'default_latency_ms': latency_ms,
+        'jitter_ms': jitter_ms,
+        'default_error_rate': error_rate,
+        'latency_ms': service_latency_ms or {},
+        'error_rate': service_error_rate or {},
+        'quiet': quiet
+    }
+    return server
+
+def start_in_background(**kwargs) -> tuple:
+    """Start a stand-in server on a daemon thread and return (server, base URL)"""
+    server = create_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay stand-in for arXiv, Semantic Scholar, DOI and gTTS")
+    parser.add_argument('--mode', choices=['record', 'replay'], default=os.getenv('UPSTREAM_STANDIN_MODE', 'replay'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures-dir', default=os.getenv('UPSTREAM_FIXTURES_DIR', 'fixtures/upstream'))
+    parser.add_argument('--latency-ms', type=float, default=0, help="Latency added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Random extra latency, uniform in [0, jitter]")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with HTTP 503")
+    parser.add_argument('--service-latency', action='append', metavar='SERVICE=MS',
+                        help="Per-service latency override, e.g. tts_service=800")
+    parser.add_argument('--service-error-rate', action='append', metavar='SERVICE=RATE',
+                        help="Per-service error rate override, e.g. semantic_scholar_api=0.1")
+    parser.add_argument('--quiet', action='store_true', help="Do not log each request")
+    args = parser.parse_args()
+
+    server = create_server(
+        host=args.host,
+        port=args.port,
+        mode=args.mode,
+        fixtures_dir=args.fixtures_dir,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        service_latency_ms=parse_service_values(args.service_latency, float),
+        service_error_rate=parse_service_values(args.service_error_rate, float),
+        quiet=args.quiet
+    )
+    print(f"Upstream stand-in ({args.mode}) listening on http://{args.host}:{server.server_address[1]}")
+    print(f"Fixtures: {os.path.abspath(args.fixtures_dir)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+        server.server_close()
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
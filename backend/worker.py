@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Worker processes for the durable job queue (see job_queue.py)
+
+Run alongside the API to handle requests made with async_mode=true:
+    python worker.py --workers 4
+Each worker process claims one job at a time, runs the same pipeline as the
+synchronous endpoints and records the result for GET /jobs/{job_id}.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from config import Config
+from logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+def collect_artifacts(result: dict) -> dict:
+    """Papers and narration texts registered by the job, for the web process to adopt"""
+    import audio_jobs
+    import paper_store
+    artifacts = {'papers': [], 'narrations': []}
+    if result.get('paper_id'):
+        paper = paper_store.get_paper(result['paper_id'])
+        if paper:
+            artifacts['papers'].append(paper)
+    if result.get('audio_job'):
+        text = audio_jobs.get_narration_text(result['audio_job'])
+        if text:
+            artifacts['narrations'].append(text)
+    return artifacts
+
+async def run_job(job: dict):
+    import job_queue
+    from main import JOB_RUNNERS, PipelineError
+    runner = JOB_RUNNERS.get(job['kind'])
+    if runner is None:
+        job_queue.fail(job['job_id'], f"Unknown job kind: {job['kind']}", retry=False)
+        return
+    try:
+        result = await runner(**job['payload'])
+    except PipelineError as e:
+        # The input itself is bad; retrying would fail the same way
+        logger.warning("Job %s failed permanently: %s", job['job_id'], e)
+        job_queue.fail(job['job_id'], str(e), result=e.content, retry=False)
+        return
+    except Exception as e:
+        logger.exception("Job %s failed: %s", job['job_id'], e)
+        job_queue.fail(job['job_id'], str(e))
+        return
+    job_queue.complete(job['job_id'], result, collect_artifacts(result))
+    logger.info("Job %s (%s) succeeded", job['job_id'], job['kind'])
+
+def keep_lease(job_id: str, worker_name: str, done: threading.Event):
+    """Renew the job's lease at a third of its length until done is set"""
+    import job_queue
+    interval = max(Config.get_job_lease_seconds() / 3, 1)
+    try:
+        while not done.wait(interval):
+            if not job_queue.renew_lease(job_id, worker_name):
+                logger.warning("Worker %s lost the lease on job %s", worker_name, job_id)
+                return
+    finally:
+        job_queue.close_connection()
+
+async def work(worker_name: str, stop: multiprocessing.Event):
+    import job_queue
+    from logging_config import job_id_var
+    logger.info("Worker %s started", worker_name)
+    while not stop.is_set():
+        job = job_queue.claim(worker_name)
+        if job is None:
+            job_queue.purge_expired()
+            await asyncio.sleep(Config.get_job_poll_interval())
+            continue
+        token = job_id_var.set(job['job_id'])
+        # A thread, so the lease is kept even while a stage blocks the event loop
+        done = threading.Event()
+        heartbeat = threading.Thread(target=keep_lease, args=(job['job_id'], worker_name, done),
+                                     name="lease", daemon=True)
+        heartbeat.start()
+        try:
+            logger.info("Worker %s running %s job %s (attempt %s)", worker_name, job['kind'], job['job_id'], job['attempts'])
+            await run_job(job)
+        finally:
+            done.set()
+            heartbeat.join()
+            job_id_var.reset(token)
+
+def worker_main(worker_name: str, stop: multiprocessing.Event):
+    # The parent handles Ctrl-C and sets stop; let the current job finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Workers are already separate processes, so parse on their own threads
+    # instead of each starting a parser process pool
+    os.environ.setdefault("CPU_WORKERS", "0")
+    setup_logging()
+    asyncio.run(work(worker_name, stop))
+
+def main():
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--workers", type=int, default=Config.get_job_workers(),
+                        help="number of worker processes (default: JOB_WORKERS)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    processes = []
+    for index in range(args.workers):
+        process = context.Process(
+            target=worker_main,
+            args=(f"{os.getpid()}-{index}", stop),
+            name=f"job-worker-{index}"
+        )
+        process.start()
+        processes.append(process)
+    logger.info("Started %s workers on %s", len(processes), Config.get_job_queue_path())
+
+    def request_stop(signum, frame):
+        logger.info("Stopping workers after their current jobs")
+        stop.set()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    while any(process.is_alive() for process in processes):
+        time.sleep(0.5)
+
+if __name__ == "__main__":
+    main()
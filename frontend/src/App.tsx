@@ -13,6 +13,8 @@ interface DataType {
   summary: string;
   classification: string;
   audio: string;
+  audio_job?: string | null;
+  audio_url?: string;
   source_info?: any;
   citations?: any;
 }
@@ -13,6 +13,7 @@ interface Paper {
   source: string;
   arxiv_id?: string;
   pdf_url?: string;
+  store_id?: string;
 }
 
 interface SynthesisResult {
@@ -23,6 +24,8 @@ interface SynthesisResult {
   synthesis_type: string;
   total_papers: number;
   audio: string;
+  audio_job?: string | null;
+  audio_url?: string;
   generated_at: string;
 }
 
@@ -79,7 +82,7 @@ export default function CrossPaperSynthesis({ setData, onAnalysisStart }: CrossP
   };
 
   const selectAllPapers = () => {
-    const allIds = papers.map(paper => paper.paper_id || paper.arxiv_id || paper.title);
+    const allIds = papers.map(paper => paper.store_id || paper.paper_id || paper.arxiv_id || paper.title);
     setSelectedPapers(allIds);
   };
 
@@ -129,6 +132,8 @@ export default function CrossPaperSynthesis({ setData, onAnalysisStart }: CrossP
         summary: response.data.synthesis,
         classification: `Cross-paper synthesis (${synthesisType})`,
         audio: response.data.audio || '',
+        audio_job: response.data.audio_job,
+        audio_url: response.data.audio_url,
         source_info: {
           title: `Cross-paper Synthesis: ${query}`,
           authors: ['AI Synthesis Engine'],
@@ -273,7 +278,7 @@ export default function CrossPaperSynthesis({ setData, onAnalysisStart }: CrossP
           
           <div className="space-y-4 max-h-96 overflow-y-auto">
             {papers.map((paper, index) => {
-              const paperId = paper.paper_id || paper.arxiv_id || paper.title;
+              const paperId = paper.store_id || paper.paper_id || paper.arxiv_id || paper.title;
               const isSelected = selectedPapers.includes(paperId);
               
               return (
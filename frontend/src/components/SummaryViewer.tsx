@@ -8,6 +8,8 @@ interface SummaryViewerProps {
     summary: string;
     classification: string;
     audio: string;
+    audio_job?: string | null;
+    audio_url?: string;
     source_info?: any;
     citations?: any;
   };
@@ -21,8 +23,20 @@ export default function SummaryViewer({ data }: SummaryViewerProps) {
   const [audioLoading, setAudioLoading] = useState(false);
   const [activeSummaryTab, setActiveSummaryTab] = useState<'full' | 'tldr'>('full');
   const [copied, setCopied] = useState(false);
+  const [audioPath, setAudioPath] = useState(data?.audio || '');
   const audioRef = useRef<HTMLAudioElement>(null);
 
+  // Narration is synthesized when its URL is first fetched (preload="none" keeps
+  // that to an actual play); the stream sends frames as they are synthesized,
+  // then serves the finished file with range support
+  useEffect(() => {
+    if (data?.audio || !data?.audio_job) {
+      setAudioPath(data?.audio || '');
+      return;
+    }
+    setAudioPath(data.audio_url || `audio/${data.audio_job}/stream`);
+  }, [data?.audio, data?.audio_job, data?.audio_url]);
+
   if (!data) return null;
 
   const handleAudioError = (e: any) => {
@@ -243,7 +257,7 @@ export default function SummaryViewer({ data }: SummaryViewerProps) {
           Audio Summary
         </h2>
 
-        {data.audio && !audioError ? (
+        {audioPath && !audioError ? (
           <div className="bg-purple-800/50 rounded-xl p-6">
             <div className="flex items-center justify-between mb-6">
               <div className="flex items-center space-x-4">
@@ -306,10 +320,10 @@ export default function SummaryViewer({ data }: SummaryViewerProps) {
               onTimeUpdate={handleTimeUpdate}
               onLoadedMetadata={handleLoadedMetadata}
               onCanPlay={handleCanPlay}
-              preload="metadata"
+              preload="none"
               crossOrigin="anonymous"
             >
-              <source src={`http://localhost:8000/${data.audio}`} type="audio/mp3" />
+              <source src={`http://localhost:8000/${audioPath}`} type="audio/mp3" />
               Your browser does not support the audio element.
             </audio>
           </div>